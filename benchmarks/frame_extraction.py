@@ -0,0 +1,67 @@
+"""
+Compare the frame rate of reading every frame with read() to skipping unused frames with grab().
+Usage: python -m benchmarks.frame_extraction <video path> [no of frames]
+"""
+import sys
+import time
+
+import cv2 as cv
+
+from utilities.video_to_frames import read_frames
+
+FREQUENCIES = (1, 2, 3, 5, 10)
+
+
+def read_every_frame(video_path: str, start: int, end: int, every: int) -> int:
+    """
+    The previous extraction loop. Every frame is read and decoded, unused frames are thrown away.
+    :return: Number of frames kept.
+    """
+    capture = cv.VideoCapture(video_path)
+    capture.set(1, start)
+    frame, kept = start, 0
+    while frame < end:
+        _, image = capture.read()
+        if image is None:
+            break
+        if frame % every == 0:
+            kept += 1
+        frame += 1
+    capture.release()
+    return kept
+
+
+def grab_frames(video_path: str, start: int, end: int, every: int) -> int:
+    """
+    The current extraction loop. Only the frames that are kept are retrieved.
+    :return: Number of frames kept.
+    """
+    return sum(1 for _ in read_frames(video_path, None, start, end, every))
+
+
+def frames_per_second(function: callable, video_path: str, no_of_frames: int, every: int) -> float:
+    """
+    Run the function over the frames and return how many video frames were gone through per second.
+    """
+    start = time.perf_counter()
+    function(video_path, 0, no_of_frames, every)
+    return no_of_frames / (time.perf_counter() - start)
+
+
+def main() -> None:
+    video_path = sys.argv[1]
+    capture = cv.VideoCapture(video_path)
+    frame_count = int(capture.get(cv.CAP_PROP_FRAME_COUNT))
+    capture.release()
+    no_of_frames = min(int(sys.argv[2]) if len(sys.argv) > 2 else 1000, frame_count)
+
+    print(f"Frames: {no_of_frames:,}")
+    print(f"{'Every':>6} {'read() fps':>12} {'grab() fps':>12} {'Speedup':>8}")
+    for every in FREQUENCIES:
+        read_fps = frames_per_second(read_every_frame, video_path, no_of_frames, every)
+        grab_fps = frames_per_second(grab_frames, video_path, no_of_frames, every)
+        print(f"{every:>6} {read_fps:>12.1f} {grab_fps:>12.1f} {grab_fps / read_fps:>7.2f}x")
+
+
+if __name__ == '__main__':
+    main()
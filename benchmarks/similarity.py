@@ -0,0 +1,74 @@
+"""
+Compare SequenceMatcher.quick_ratio to the Levenshtein similarity on the lines of subtitle files.
+Each line is paired with the next line and with a copy that has an ocr-like error, like adjacent frames are.
+Usage: python -m benchmarks.similarity [srt file ...]
+"""
+import random
+import re
+import sys
+import time
+from difflib import SequenceMatcher
+from pathlib import Path
+
+import utilities.similarity as similarity_module
+from utilities.similarity import similarity
+
+DEFAULT_FILES = [Path(__file__).parent.parent / "test files" / "chinese_vid.srt"]
+THRESHOLD = 0.85
+
+
+def subtitle_lines(srt_file: Path) -> list:
+    """
+    The text lines of a subtitle file without the cue numbers and timecodes.
+    """
+    lines = srt_file.read_text(encoding="utf-8").splitlines()
+    return [line for line in lines if line.strip() and not re.fullmatch(r"\d+|[\d:,]+ --> [\d:,]+", line.strip())]
+
+
+def text_pairs(lines: list) -> list:
+    """
+    Pair each line with the next line and with a copy of itself that has one character replaced.
+    """
+    random.seed(0)
+    pairs = list(zip(lines, lines[1:]))
+    for line in lines:
+        index = random.randrange(len(line))
+        pairs.append((line, f"{line[:index]}{random.choice(line)}{line[index + 1:]}"))
+    return pairs
+
+
+def sequence_matcher(text1: str, text2: str, cutoff: float) -> float:
+    return SequenceMatcher(a=text1, b=text2).quick_ratio()
+
+
+def seconds(function: callable, pairs: list, repeat: int = 20) -> tuple[float, list]:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        scores = [function(text1, text2, THRESHOLD) for text1, text2 in pairs]
+    return (time.perf_counter() - start) / repeat, scores
+
+
+def main() -> None:
+    srt_files = [Path(name) for name in sys.argv[1:]] or DEFAULT_FILES
+    rapidfuzz = similarity_module.rapidfuzz_levenshtein
+    for srt_file in srt_files:
+        pairs = text_pairs(subtitle_lines(srt_file))
+        matcher_time, matcher_scores = seconds(sequence_matcher, pairs)
+        similarity_module.rapidfuzz_levenshtein = None
+        python_time, python_scores = seconds(similarity, pairs)
+        print(f"{srt_file.name}: {len(pairs):,} pairs\n"
+              f"  SequenceMatcher: {matcher_time * 1000:.2f}ms\n"
+              f"  Bit-parallel Levenshtein: {python_time * 1000:.2f}ms, "
+              f"Speedup: {matcher_time / python_time:.1f}x")
+        if rapidfuzz:
+            similarity_module.rapidfuzz_levenshtein = rapidfuzz
+            rapidfuzz_time, _ = seconds(similarity, pairs)
+            print(f"  Rapidfuzz Levenshtein: {rapidfuzz_time * 1000:.2f}ms, "
+                  f"Speedup: {matcher_time / rapidfuzz_time:.1f}x")
+        disagreements = sum((score1 >= THRESHOLD) != (score2 >= THRESHOLD)
+                            for score1, score2 in zip(matcher_scores, python_scores))
+        print(f"  Pairs merged by only one of them at {THRESHOLD=}: {disagreements:,}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,34 @@
+"""
+Measure how long it takes to import the gui and main modules in a fresh interpreter.
+Usage: python -m benchmarks.startup_time [no of runs]
+"""
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+MODULES = ("main", "gui")
+IMPORT_TIMER = "import time; start = time.perf_counter(); import {}; print(time.perf_counter() - start)"
+
+
+def import_time(module: str) -> float:
+    """
+    Import the module in a new interpreter, so nothing is cached from previous imports.
+    :return: Import time in seconds.
+    """
+    result = subprocess.run([sys.executable, "-c", IMPORT_TIMER.format(module)], capture_output=True, text=True,
+                            cwd=Path(__file__).parent.parent, check=True)
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    print(f"Runs: {runs}")
+    print(f"{'Module':>8} {'Min (s)':>9} {'Median (s)':>11}")
+    for module in MODULES:
+        times = [import_time(module) for _ in range(runs)]
+        print(f"{module:>8} {min(times):>9.3f} {statistics.median(times):>11.3f}")
+
+
+if __name__ == '__main__':
+    main()
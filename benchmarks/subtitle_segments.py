@@ -0,0 +1,103 @@
+"""
+Compare the array backed subtitle segments to the previous dictionary with "start--end" string keys.
+Usage: python -m benchmarks.subtitle_segments [no of segments]
+"""
+import random
+import sys
+import time
+from itertools import pairwise
+
+from utilities.segments import (Segments, merge_adjacent_equal_texts, remove_short_duration_consecutive_subs,
+                                remove_short_duration_subs)
+
+DIVIDER = "--"
+MIN_CONSECUTIVE_SUB_DUR_MS, MAX_CONSECUTIVE_SHORT_DURS, MIN_SUB_DURATION_MS = 500.0, 4, 120.0
+
+
+def name_to_duration(name: str) -> float:
+    name_timecode = name.split(DIVIDER)
+    return float(name_timecode[1]) - float(name_timecode[0])
+
+
+def legacy_merge_adjacent_equal_texts(subtitle_texts: dict) -> dict:
+    new_subtitle_dict, starting_key, no_of_keys = {}, None, len(subtitle_texts)
+    for index, (key1, key2) in enumerate(pairwise(subtitle_texts.items()), start=2):
+        if key1[1] == key2[1] and index != no_of_keys:
+            if not starting_key:
+                starting_key = key1[0]
+        else:
+            if not starting_key:
+                starting_key = key1[0]
+            new_subtitle_dict[f"{starting_key}{DIVIDER}{key1[0]}"] = key1[1]
+            if index == no_of_keys:
+                new_subtitle_dict[f"{key2[0]}{DIVIDER}{key2[0]}"] = key2[1]
+            starting_key = None
+    return new_subtitle_dict
+
+
+def legacy_remove_short_duration_consecutive_subs(subtitle_texts: dict) -> dict:
+    keys_for_deletion, short_dur_keys, no_of_keys = set(), set(), len(subtitle_texts)
+    for index, (dur_1, dur_2) in enumerate(pairwise(subtitle_texts), start=2):
+        key1_dur, key2_dur = name_to_duration(dur_1), name_to_duration(dur_2)
+        if key1_dur < MIN_CONSECUTIVE_SUB_DUR_MS and key2_dur < MIN_CONSECUTIVE_SUB_DUR_MS and index != no_of_keys:
+            short_dur_keys.add(dur_1)
+            short_dur_keys.add(dur_2)
+        else:
+            if len(short_dur_keys) >= MAX_CONSECUTIVE_SHORT_DURS:
+                keys_for_deletion.update(short_dur_keys)
+            short_dur_keys = set()
+    return {key: text for key, text in subtitle_texts.items() if key not in keys_for_deletion}
+
+
+def legacy_remove_short_duration_subs(subtitle_texts: dict) -> dict:
+    return {key: text for key, text in subtitle_texts.items() if name_to_duration(key) > MIN_SUB_DURATION_MS}
+
+
+def legacy_passes(positions: list, texts: list) -> list:
+    subtitle_texts = {str(position): text for position, text in zip(positions, texts)}
+    subtitle_texts = legacy_merge_adjacent_equal_texts(subtitle_texts)
+    subtitle_texts = legacy_remove_short_duration_consecutive_subs(subtitle_texts)
+    subtitle_texts = legacy_remove_short_duration_subs(subtitle_texts)
+    return list(subtitle_texts.values())
+
+
+def segment_passes(positions: list, texts: list) -> list:
+    segments = Segments.from_frames(positions, texts)
+    segments = merge_adjacent_equal_texts(segments)
+    segments = remove_short_duration_consecutive_subs(segments, MIN_CONSECUTIVE_SUB_DUR_MS, MAX_CONSECUTIVE_SHORT_DURS)
+    segments = remove_short_duration_subs(segments, MIN_SUB_DURATION_MS)
+    return segments.texts
+
+
+def frame_texts(no_of_segments: int) -> tuple[list, list]:
+    """
+    Frame positions and texts of a video where each text is shown for 1 to 60 frames at 30 fps.
+    """
+    random.seed(0)
+    positions, texts = [], []
+    for segment in range(no_of_segments):
+        text = f"subtitle line {segment}"
+        for _ in range(random.randint(1, 60)):
+            positions.append(len(positions) * 1000 / 30)
+            texts.append(text)
+    return positions, texts
+
+
+def seconds(function: callable, positions: list, texts: list) -> tuple[float, list]:
+    start = time.perf_counter()
+    result = function(positions, texts)
+    return time.perf_counter() - start, result
+
+
+def main() -> None:
+    no_of_segments = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    positions, texts = frame_texts(no_of_segments)
+    print(f"Segments: {no_of_segments:,}, Frames: {len(positions):,}")
+    legacy_time, legacy_result = seconds(legacy_passes, positions, texts)
+    segment_time, segment_result = seconds(segment_passes, positions, texts)
+    assert legacy_result == segment_result, "The passes gave different subtitles!"
+    print(f"String keys: {legacy_time:.3f}s, Segments: {segment_time:.3f}s, Speedup: {legacy_time / segment_time:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -589,8 +589,9 @@ class PaddleOCR(predict_system.TextSystem):
         # download model if using paddle infer
         if not params.use_onnx:
             maybe_download(params.det_model_dir, det_url)
-            maybe_download(params.rec_model_dir, rec_url)
-            maybe_download(params.cls_model_dir, cls_url)
+            if not params.det_only:
+                maybe_download(params.rec_model_dir, rec_url)
+                maybe_download(params.cls_model_dir, cls_url)
 
         if params.det_algorithm not in SUPPORT_DET_MODEL:
             logger.error("det_algorithm must in {}".format(SUPPORT_DET_MODEL))
@@ -698,3 +699,51 @@ class PaddleOCR(predict_system.TextSystem):
             if not rec:
                 return cls_res
             return ocr_res
+
+    def ocr_batch(self, imgs, cls=True, alpha_color=(255, 255, 255)):
+        """
+        OCR a batch of images, the text detection runs once for the images with the same shape
+        and the text recognition runs once for the text lines of all the images.
+
+        args:
+            imgs: list of ndarray images, e.g. subtitle crops of the same video.
+            cls: use angle classifier or not. Default is True.
+            alpha_color: set RGB color Tuple for transparent parts replacement. Default is pure white.
+        return: list with the same format as the ocr results of each image.
+        """
+        if cls == True and self.use_angle_cls == False:
+            logger.warning(
+                "Since the angle classifier is not initialized, it will not be used during the forward process"
+            )
+        imgs = [alpha_to_color(check_img(img, alpha_color)[0], alpha_color) for img in imgs]
+        results, _ = self.batch_call(imgs, cls)
+        ocr_res = []
+        for dt_boxes, rec_res in results:
+            if not dt_boxes and not rec_res:
+                ocr_res.append(None)
+                continue
+            ocr_res.append([[box.tolist(), res] for box, res in zip(dt_boxes, rec_res)])
+        return ocr_res
+
+    def detect_batch(self, imgs, alpha_color=(255, 255, 255)):
+        """
+        Detect the text boxes in a batch of images with the same shape without recognizing the text.
+        The detection runs once for the whole batch.
+
+        args:
+            imgs: list of ndarray images with the same shape.
+            alpha_color: set RGB color Tuple for transparent parts replacement. Default is pure white.
+        return: list with the [box, score] of each text box in each image from top to bottom, left to right,
+            or None for an image without text. The score is the mean text probability inside the box.
+        """
+        imgs = [alpha_to_color(check_img(img, alpha_color)[0], alpha_color) for img in imgs]
+        results, _ = self.text_detector.predict_batch(imgs, return_scores=True)
+        det_res = []
+        for result in results:
+            if result is None or len(result[0]) == 0:
+                det_res.append(None)
+                continue
+            dt_boxes, scores = result
+            order = sorted(range(len(dt_boxes)), key=lambda i: (dt_boxes[i][0][1], dt_boxes[i][0][0]))
+            det_res.append([[dt_boxes[i].tolist(), float(scores[i])] for i in order])
+        return det_res
@@ -150,10 +150,13 @@ class TextDetector(object):
             points[pno, 1] = int(min(max(points[pno, 1], 0), img_height - 1))
         return points
 
-    def filter_tag_det_res(self, dt_boxes, image_shape):
+    def filter_tag_det_res(self, dt_boxes, image_shape, scores=None):
+        """
+        scores: optional score of each box, the scores of the kept boxes are returned with them when given
+        """
         img_height, img_width = image_shape[0:2]
-        dt_boxes_new = []
-        for box in dt_boxes:
+        dt_boxes_new, scores_new = [], []
+        for index, box in enumerate(dt_boxes):
             if type(box) is list:
                 box = np.array(box)
             box = self.order_points_clockwise(box)
@@ -163,7 +166,11 @@ class TextDetector(object):
             if rect_width <= 3 or rect_height <= 3:
                 continue
             dt_boxes_new.append(box)
+            if scores is not None:
+                scores_new.append(scores[index])
         dt_boxes = np.array(dt_boxes_new)
+        if scores is not None:
+            return dt_boxes, scores_new
         return dt_boxes
 
     def filter_tag_det_res_only_clip(self, dt_boxes, image_shape):
@@ -236,6 +243,55 @@ class TextDetector(object):
         et = time.time()
         return dt_boxes, et - st
 
+    def predict_batch(self, img_list, return_scores=False):
+        """
+        Detect text in a batch of images that have the same shape with a single predictor run.
+        args:
+            img_list: list of images (numpy.ndarray) with the same shape
+            return_scores: also return the score of each box, the mean of the probability map inside the box
+        return: list of dt_boxes or (dt_boxes, scores) for each image, elapsed time
+        """
+        st = time.time()
+        norm_img_batch, shape_list = [], []
+        for img in img_list:
+            data = transform({"image": img}, self.preprocess_op)
+            if data is None or data[0] is None:
+                return [None] * len(img_list), 0
+            norm_img_batch.append(data[0])
+            shape_list.append(data[1])
+        norm_img_batch = np.stack(norm_img_batch)
+        shape_list = np.stack(shape_list)
+
+        if self.use_onnx:
+            input_dict = {}
+            input_dict[self.input_tensor.name] = norm_img_batch
+            outputs = self.predictor.run(self.output_tensors, input_dict)
+        else:
+            self.input_tensor.copy_from_cpu(norm_img_batch)
+            self.predictor.run()
+            outputs = []
+            for output_tensor in self.output_tensors:
+                output = output_tensor.copy_to_cpu()
+                outputs.append(output)
+
+        preds = {}
+        if self.det_algorithm in ["DB", "PSE", "DB++"]:
+            preds["maps"] = outputs[0]
+        else:
+            raise NotImplementedError
+
+        post_result = self.postprocess_op(preds, shape_list)
+        dt_boxes_list = []
+        for img, result in zip(img_list, post_result):
+            if self.args.det_box_type == "poly":
+                dt_boxes = self.filter_tag_det_res_only_clip(result["points"], img.shape)
+                scores = list(result["scores"])
+            else:
+                dt_boxes, scores = self.filter_tag_det_res(result["points"], img.shape, result["scores"])
+            dt_boxes_list.append((dt_boxes, scores) if return_scores else dt_boxes)
+        et = time.time()
+        return dt_boxes_list, et - st
+
     def __call__(self, img, use_slice=False):
         # For image like poster with one side much greater than the other side,
         # splitting recursively and processing with overlap to enhance performance.
@@ -32,6 +32,16 @@ from ppocr.utils.logging import get_logger
 logger = get_logger()
 
 
+def get_width_buckets(args, rec_image_shape, rec_algorithm):
+    """
+    width buckets only apply to the recognizers whose input width follows the text
+    """
+    if rec_algorithm in ["SVTR", "SATRN", "ParseQ", "CPPD"]:
+        return []
+    buckets = utility.get_rec_width_buckets(args)
+    return [width for width in buckets if width >= rec_image_shape[2]]
+
+
 class TextRecognizer(object):
     def __init__(self, args, logger=None):
         if logger is None:
@@ -74,6 +84,70 @@ class TextRecognizer(object):
                 logger=logger,
             )
         self.return_word_box = args.return_word_box
+        self.width_buckets = get_width_buckets(args, self.rec_image_shape, self.rec_algorithm)
+        self.batch_sizes = utility.get_rec_batch_sizes(self.rec_batch_num)
+        self.bucket_stats = {}
+        if self.width_buckets and args.rec_warmup:
+            self.warmup()
+
+    def bucket_width(self, max_wh_ratio):
+        """
+        the smallest width bucket that fits the ratio. ratios wider than the largest bucket are rounded up
+        to a multiple of the largest bucket.
+        """
+        imgH = self.rec_image_shape[1]
+        width = math.ceil(imgH * max_wh_ratio)
+        for bucket in self.width_buckets:
+            if width <= bucket:
+                return bucket
+        return math.ceil(width / self.width_buckets[-1]) * self.width_buckets[-1]
+
+    def bucket_batch_size(self, batch_size):
+        """
+        the smallest batch size used with width buckets that fits the batch
+        """
+        return next(size for size in self.batch_sizes if size >= batch_size)
+
+    def warmup(self):
+        """
+        run the predictor once for each width bucket and batch size, so no batch pays for building the kernels
+        of its input shape. small batches run at their own size, larger ones are padded to the next batch size.
+        """
+        st = time.time()
+        imgC, imgH = self.rec_image_shape[:2]
+        for width in self.width_buckets:
+            for batch_size in self.batch_sizes:
+                self.run_predictor(np.zeros((batch_size, imgC, imgH, width), dtype=np.float32))
+        logger.debug(
+            "rec warmup widths: {}, batch sizes: {}, elapsed : {}".format(
+                self.width_buckets, self.batch_sizes, time.time() - st
+            )
+        )
+
+    def take_bucket_stats(self):
+        """
+        batch count and predictor time of each input width since the last call
+        """
+        stats, self.bucket_stats = self.bucket_stats, {}
+        return stats
+
+    def run_predictor(self, norm_img_batch):
+        if self.use_onnx:
+            input_dict = {}
+            input_dict[self.input_tensor.name] = norm_img_batch
+            outputs = self.predictor.run(self.output_tensors, input_dict)
+            return outputs[0]
+        self.input_tensor.copy_from_cpu(norm_img_batch)
+        self.predictor.run()
+        outputs = []
+        for output_tensor in self.output_tensors:
+            output = output_tensor.copy_to_cpu()
+            outputs.append(output)
+        if self.benchmark:
+            self.autolog.times.stamp()
+        if len(outputs) != 1:
+            return outputs
+        return outputs[0]
 
     def resize_norm_img(self, img, max_wh_ratio):
         imgC, imgH, imgW = self.rec_image_shape
@@ -135,6 +209,8 @@ class TextRecognizer(object):
                 wh_ratio = w * 1.0 / h
                 max_wh_ratio = max(max_wh_ratio, wh_ratio)
                 wh_ratio_list.append(wh_ratio)
+            if self.width_buckets:
+                max_wh_ratio = self.bucket_width(max_wh_ratio) / imgH
             for ino in range(beg_img_no, end_img_no):
                 if self.rec_algorithm in ["SVTR", "SATRN", "ParseQ", "CPPD"]:
                     norm_img = self.resize_norm_img_svtr(
@@ -148,29 +224,23 @@ class TextRecognizer(object):
                     )
                     norm_img = norm_img[np.newaxis, :]
                     norm_img_batch.append(norm_img)
+            batch_size = end_img_no - beg_img_no
+            if self.width_buckets:
+                # pad large batches with blank images, so their sizes come from a small set too
+                padding = self.bucket_batch_size(batch_size) - batch_size
+                norm_img_batch.extend([np.zeros_like(norm_img_batch[0])] * padding)
             norm_img_batch = np.concatenate(norm_img_batch)
             norm_img_batch = norm_img_batch.copy()
             if self.benchmark:
                 self.autolog.times.stamp()
 
-            if self.use_onnx:
-                input_dict = {}
-                input_dict[self.input_tensor.name] = norm_img_batch
-                outputs = self.predictor.run(self.output_tensors, input_dict)
-                preds = outputs[0]
-            else:
-                self.input_tensor.copy_from_cpu(norm_img_batch)
-                self.predictor.run()
-                outputs = []
-                for output_tensor in self.output_tensors:
-                    output = output_tensor.copy_to_cpu()
-                    outputs.append(output)
-                if self.benchmark:
-                    self.autolog.times.stamp()
-                if len(outputs) != 1:
-                    preds = outputs
-                else:
-                    preds = outputs[0]
+            predictor_st = time.time()
+            preds = self.run_predictor(norm_img_batch)
+            if self.width_buckets:
+                preds = [pred[:batch_size] for pred in preds] if isinstance(preds, list) else preds[:batch_size]
+                width = norm_img_batch.shape[3]
+                batches, seconds = self.bucket_stats.get(width, (0, 0.0))
+                self.bucket_stats[width] = (batches + 1, seconds + time.time() - predictor_st)
             if self.postprocess_params["name"] == "CTCLabelDecode":
                 rec_result = self.postprocess_op(
                     preds,
@@ -21,6 +21,9 @@ sys.path.insert(0, os.path.abspath(os.path.join(__dir__, "../..")))
 os.environ["FLAGS_allocator_strategy"] = "auto_growth"
 
 import copy
+from collections import deque
+
+import cv2
 import numpy as np
 import time
 import logging
@@ -37,6 +40,48 @@ from tools.infer.utility import (
 
 logger = get_logger()
 
+# temporal detection: frames are compared at this scale
+LAYOUT_SCALE = 0.25
+# difference in grayscale level needed for a pixel to count as changed
+LAYOUT_PIXEL_LEVEL = 30
+# the layout has changed when more pixels than this changed outside the boxes
+LAYOUT_CHANGED_PIXELS = 8
+# number of recent detections kept, frames from a few parts of a video can arrive interleaved
+LAYOUT_KEYFRAMES = 4
+
+
+def layout_signature(img):
+    """
+    Small grayscale version of an image that is cheap to compare with other images.
+    """
+    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY) if img.ndim == 3 else img
+    return cv2.resize(
+        gray, None, fx=LAYOUT_SCALE, fy=LAYOUT_SCALE, interpolation=cv2.INTER_AREA
+    )
+
+
+class LayoutKeyframe(object):
+    def __init__(self, img, dt_boxes):
+        """
+        An image where the text detector ran and the boxes it found.
+        Other images have the same layout when nothing changed outside the boxes,
+        changes inside the boxes are left to the recognizer.
+        """
+        self.signature = layout_signature(img)
+        self.dt_boxes = dt_boxes
+        self.outside_boxes = np.full(self.signature.shape, 255, dtype=np.uint8)
+        if len(dt_boxes):
+            polygons = [np.round(box * LAYOUT_SCALE).astype(np.int32) for box in dt_boxes]
+            cv2.fillPoly(self.outside_boxes, polygons, 0)
+        self.outside_boxes = self.outside_boxes > 0
+        self.reuses = 0
+
+    def same_layout(self, signature):
+        if signature.shape != self.signature.shape:
+            return False
+        changed = cv2.absdiff(signature, self.signature) > LAYOUT_PIXEL_LEVEL
+        return np.count_nonzero(changed & self.outside_boxes) <= LAYOUT_CHANGED_PIXELS
+
 
 class TextSystem(object):
     def __init__(self, args):
@@ -44,14 +89,43 @@ class TextSystem(object):
             logger.setLevel(logging.INFO)
 
         self.text_detector = predict_det.TextDetector(args)
-        self.text_recognizer = predict_rec.TextRecognizer(args)
-        self.use_angle_cls = args.use_angle_cls
+        self.det_only = getattr(args, "det_only", False)
+        self.text_recognizer = None if self.det_only else predict_rec.TextRecognizer(args)
+        self.use_angle_cls = args.use_angle_cls and not self.det_only
         self.drop_score = args.drop_score
         if self.use_angle_cls:
             self.text_classifier = predict_cls.TextClassifier(args)
 
         self.args = args
         self.crop_image_res_index = 0
+        self.use_temporal_det = getattr(args, "use_temporal_det", False)
+        self.temporal_det_max_reuse = getattr(args, "temporal_det_max_reuse", 30)
+        self.layout_keyframes = deque(maxlen=LAYOUT_KEYFRAMES)
+        self.temporal_stats = {"detected": 0, "reused": 0}
+
+    def reusable_boxes(self, img):
+        """
+        temporal mode: return the boxes of a recent detection with the same layout as the image,
+        or None when the text detector has to run. A detection is reused at most temporal_det_max_reuse times.
+        """
+        if not self.use_temporal_det:
+            return None
+        signature = layout_signature(img)
+        for keyframe in self.layout_keyframes:
+            if keyframe.reuses < self.temporal_det_max_reuse and keyframe.same_layout(signature):
+                keyframe.reuses += 1
+                self.temporal_stats["reused"] += 1
+                return keyframe.dt_boxes
+        return None
+
+    def remember_boxes(self, img, dt_boxes):
+        """
+        temporal mode: keep the boxes the text detector found in the image, so later images can reuse them.
+        """
+        if not self.use_temporal_det or dt_boxes is None:
+            return
+        self.temporal_stats["detected"] += 1
+        self.layout_keyframes.appendleft(LayoutKeyframe(img, dt_boxes))
 
     def __call__(self, img, cls=True, slice={}):
         time_dict = {"det": 0, "rec": 0, "cls": 0, "all": 0}
@@ -85,8 +159,11 @@ class TextSystem(object):
                 y_threshold=slice["merge_y_thres"],
             )
             elapse = sum(elapsed)
+        elif (dt_boxes := self.reusable_boxes(img)) is not None:
+            elapse = 0
         else:
             dt_boxes, elapse = self.text_detector(img)
+            self.remember_boxes(img, dt_boxes)
 
         time_dict["det"] = elapse
 
@@ -99,6 +176,56 @@ class TextSystem(object):
             logger.debug(
                 "dt_boxes num : {}, elapsed : {}".format(len(dt_boxes), elapse)
             )
+        filter_boxes, filter_rec_res = self.recognize(ori_im, dt_boxes, cls, time_dict)
+        end = time.time()
+        time_dict["all"] = end - start
+        return filter_boxes, filter_rec_res, time_dict
+
+    def batch_call(self, img_list, cls=True):
+        """
+        Detect the text of a batch of images, images with the same shape are detected in one detector run.
+        The text lines of all the images are then recognized together, so the recognizer batches are filled
+        with lines from many images instead of the one or two lines of a single image.
+        In temporal mode the images with the same layout as a recent detection reuse its boxes
+        and only the other images are detected.
+        return: list of (filter_boxes, filter_rec_res) for each image, time_dict
+        """
+        time_dict = {"det": 0, "rec": 0, "cls": 0, "all": 0}
+        start = time.time()
+        dt_boxes_list = [self.reusable_boxes(img) for img in img_list]
+        shape_groups = {}
+        for index, dt_boxes in enumerate(dt_boxes_list):
+            if dt_boxes is None:
+                shape_groups.setdefault(img_list[index].shape, []).append(index)
+        for detect in shape_groups.values():
+            detected, elapse = self.text_detector.predict_batch([img_list[index] for index in detect])
+            time_dict["det"] += elapse
+            for index, dt_boxes in zip(detect, detected):
+                dt_boxes_list[index] = dt_boxes
+                self.remember_boxes(img_list[index], dt_boxes)
+
+        all_boxes, all_crops, owners = [], [], []
+        for index, (img, dt_boxes) in enumerate(zip(img_list, dt_boxes_list)):
+            if dt_boxes is None:
+                continue
+            boxes, crops = self.crop_boxes(img, dt_boxes)
+            all_boxes.extend(boxes)
+            all_crops.extend(crops)
+            owners.extend([index] * len(crops))
+        rec_res = self.recognize_crops(all_crops, cls, time_dict)
+        results = [(None, None) if dt_boxes is None else ([], []) for dt_boxes in dt_boxes_list]
+        for index, box, rec_result in zip(owners, all_boxes, rec_res):
+            if rec_result[1] >= self.drop_score:
+                results[index][0].append(box)
+                results[index][1].append(rec_result)
+        time_dict["all"] = time.time() - start
+        return results, time_dict
+
+    def crop_boxes(self, ori_im, dt_boxes):
+        """
+        Crop the detected boxes out of the image.
+        return: boxes sorted from top to bottom, left to right and the crop of each box
+        """
         img_crop_list = []
 
         dt_boxes = sorted_boxes(dt_boxes)
@@ -110,9 +237,34 @@ class TextSystem(object):
             else:
                 img_crop = get_minarea_rect_crop(ori_im, tmp_box)
             img_crop_list.append(img_crop)
+        return dt_boxes, img_crop_list
+
+    def recognize(self, ori_im, dt_boxes, cls=True, time_dict=None):
+        """
+        Crop the detected boxes out of the image and recognize their text.
+        return: boxes and recognition results with a score of at least drop_score
+        """
+        dt_boxes, img_crop_list = self.crop_boxes(ori_im, dt_boxes)
+        rec_res = self.recognize_crops(img_crop_list, cls, time_dict)
+        filter_boxes, filter_rec_res = [], []
+        for box, rec_result in zip(dt_boxes, rec_res):
+            text, score = rec_result[0], rec_result[1]
+            if score >= self.drop_score:
+                filter_boxes.append(box)
+                filter_rec_res.append(rec_result)
+        return filter_boxes, filter_rec_res
+
+    def recognize_crops(self, img_crop_list, cls=True, time_dict=None):
+        """
+        Classify the angle of the text crops and recognize their text.
+        return: recognition result of each crop
+        """
+        time_dict = time_dict if time_dict is not None else {"rec": 0, "cls": 0}
+        if not img_crop_list:
+            return []
         if self.use_angle_cls and cls:
             img_crop_list, angle_list, elapse = self.text_classifier(img_crop_list)
-            time_dict["cls"] = elapse
+            time_dict["cls"] += elapse
             logger.debug(
                 "cls num  : {}, elapsed : {}".format(len(img_crop_list), elapse)
             )
@@ -122,17 +274,9 @@ class TextSystem(object):
             )
 
         rec_res, elapse = self.text_recognizer(img_crop_list)
-        time_dict["rec"] = elapse
+        time_dict["rec"] += elapse
         logger.debug("rec_res num  : {}, elapsed : {}".format(len(rec_res), elapse))
-        filter_boxes, filter_rec_res = [], []
-        for box, rec_result in zip(dt_boxes, rec_res):
-            text, score = rec_result[0], rec_result[1]
-            if score >= self.drop_score:
-                filter_boxes.append(box)
-                filter_rec_res.append(rec_result)
-        end = time.time()
-        time_dict["all"] = end - start
-        return filter_boxes, filter_rec_res, time_dict
+        return rec_res
 
 
 def sorted_boxes(dt_boxes):
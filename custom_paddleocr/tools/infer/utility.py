@@ -54,6 +54,8 @@ def init_args():
     parser.add_argument("--det_limit_side_len", type=float, default=960)
     parser.add_argument("--det_limit_type", type=str, default="max")
     parser.add_argument("--det_box_type", type=str, default="quad")
+    # only load the text detector, the recognizer and classifier are not created
+    parser.add_argument("--det_only", type=str2bool, default=False)
 
     # DB parmas
     parser.add_argument("--det_db_thresh", type=float, default=0.3)
@@ -69,6 +71,9 @@ def init_args():
     parser.add_argument("--rec_image_inverse", type=str2bool, default=True)
     parser.add_argument("--rec_image_shape", type=str, default="3, 48, 320")
     parser.add_argument("--rec_batch_num", type=int, default=6)
+    # recognition input widths, batches are padded to the smallest width that fits them. empty to turn off
+    parser.add_argument("--rec_width_buckets", type=str, default="")
+    parser.add_argument("--rec_warmup", type=str2bool, default=False)
     parser.add_argument("--max_text_length", type=int, default=25)
     parser.add_argument(
         "--rec_char_dict_path", type=str, default="./ppocr/utils/ppocr_keys_v1.txt"
@@ -86,6 +91,7 @@ def init_args():
     parser.add_argument("--cls_thresh", type=float, default=0.9)
 
     parser.add_argument("--enable_mkldnn", type=str2bool, default=False)
+    parser.add_argument("--mkldnn_cache_capacity", type=int, default=10)
     parser.add_argument("--cpu_threads", type=int, default=10)
     parser.add_argument("--use_pdserving", type=str2bool, default=False)
     parser.add_argument("--warmup", type=str2bool, default=False)
@@ -105,6 +111,10 @@ def init_args():
     parser.add_argument("--show_log", type=str2bool, default=True)
     parser.add_argument("--use_onnx", type=str2bool, default=False)
 
+    # temporal text detection
+    parser.add_argument("--use_temporal_det", type=str2bool, default=False)
+    parser.add_argument("--temporal_det_max_reuse", type=int, default=30)
+
     # extended function
     parser.add_argument(
         "--return_word_box",
@@ -120,6 +130,40 @@ def parse_args():
     return parser.parse_args()
 
 
+def get_rec_width_buckets(args):
+    """
+    the recognition input width buckets from small to large
+    """
+    buckets = getattr(args, "rec_width_buckets", "")
+    return sorted({int(width) for width in buckets.split(",") if width.strip()}) if buckets else []
+
+
+def get_rec_batch_sizes(rec_batch_num, exact_batch_num=8):
+    """
+    the batch sizes used with width buckets: every size up to exact_batch_num, so small batches like the one
+    or two lines of a subtitle are never padded, then powers of two below rec_batch_num and rec_batch_num itself
+    """
+    sizes = list(range(1, min(exact_batch_num, rec_batch_num) + 1))
+    size = 2 * exact_batch_num
+    while size < rec_batch_num:
+        sizes.append(size)
+        size *= 2
+    return sizes + [rec_batch_num] if sizes[-1] < rec_batch_num else sizes
+
+
+def get_mkldnn_cache_capacity(args, mode):
+    """
+    number of input shapes mkldnn keeps compiled kernels for. the recognizer keeps one shape
+    for each width bucket and batch size, plus a few for crops wider than the largest bucket.
+    """
+    capacity = getattr(args, "mkldnn_cache_capacity", 10)
+    buckets = get_rec_width_buckets(args)
+    if mode == "rec" and buckets:
+        shapes = (len(buckets) + 2) * len(get_rec_batch_sizes(args.rec_batch_num))
+        capacity = max(capacity, shapes)
+    return capacity
+
+
 def create_predictor(args, mode, logger):
     if mode == "det":
         model_dir = args.det_model_dir
@@ -226,8 +270,8 @@ def create_predictor(args, mode, logger):
         else:
             config.disable_gpu()
             if args.enable_mkldnn:
-                # cache 10 different shapes for mkldnn to avoid memory leak
-                config.set_mkldnn_cache_capacity(10)
+                # cache a limited number of shapes for mkldnn to avoid memory leak
+                config.set_mkldnn_cache_capacity(get_mkldnn_cache_capacity(args, mode))
                 config.enable_mkldnn()
                 if args.precision == "fp16":
                     config.enable_mkldnn_bfloat16()
@@ -13,9 +13,9 @@ import cv2 as cv
 import numpy as np
 from PIL import Image, ImageTk
 
-import custom_paddleocr.paddleocr as cp
 import utilities.utils as utils
-from main import SubtitleDetector, SubtitleExtractor
+from main import SubtitleExtractor, detect_sub_areas
+from utilities.frames_to_text import shutdown_ocr_pool
 from utilities.logger_setup import setup_logging
 from utilities.win_notify import Notification, Sound
 
@@ -165,7 +165,8 @@ class SubtitleExtractorGUI:
 
         self.status_label = tk.Label(self.main_frame)
         self.status_label.grid(column=0, row=3, padx=18, sticky="E")
-        self.status_label.configure(text=utils.Config.device_msg)
+        # Checking the device imports paddle, do it in the background so the window appears straight away.
+        Thread(target=lambda: self.status_label.configure(text=utils.Config.device_msg()), daemon=True).start()
 
     def _menu_bar(self) -> None:
         # Remove dashed lines that come default with tkinter menu bar.
@@ -190,6 +191,7 @@ class SubtitleExtractorGUI:
 
         # Add menu items to file menu.
         self.file_menu.add_command(label="Open file(s)", command=self._open_files)
+        self.file_menu.add_command(label="Regenerate Subtitles", command=self._regenerate_subtitles)
         self.file_menu.add_command(label="Close", command=self._on_closing)
 
         # Add menu items to view menu.
@@ -554,7 +556,7 @@ class SubtitleExtractorGUI:
             stop_dur = self.sub_ex.frame_no_to_duration(stop_frame, self.current_fps) if stop_frame else stop_frame
             self.status_label.configure(text=f"Start Frame: {start_dur}, Stop Frame: {stop_dur}")
         else:
-            self.status_label.configure(text=utils.Config.device_msg)
+            self.status_label.configure(text=utils.Config.device_msg())
 
     def _video_indexer(self) -> tuple:
         """
@@ -761,15 +763,13 @@ class SubtitleExtractorGUI:
         use_search_area = utils.Config.use_search_area
         self.thread_running = True
         try:
-            for video in self.video_queue.keys():
+            for video, new_sub_area in detect_sub_areas(list(self.video_queue), use_search_area):
+                self.video_queue[video][0] = new_sub_area
                 if utils.Process.interrupt_process:
                     logger.warning("Process interrupted\n")
                     self.thread_running = False
                     self._stop_sub_detection_process()
                     return
-                sub_dt = SubtitleDetector(video, use_search_area)
-                new_sub_area = sub_dt.get_sub_area()
-                self.video_queue[video][0] = new_sub_area
         except Exception as error:
             logger.exception(f"An error occurred while detecting subtitles! \nError: {error}")
         self.thread_running = False
@@ -828,6 +828,25 @@ class SubtitleExtractorGUI:
         self._stop_sub_extraction_process()
         self.send_notification("Subtitle Extraction Completed!")
 
+    def _regenerate_subtitles(self) -> None:
+        """
+        Create the subtitles of the videos in the queue again from their stored results.
+        Only the subtitle generator runs, so changes to its settings are applied without extracting the texts again.
+        """
+        if not self.video_queue:
+            logger.info("No video has been opened!")
+            return
+        logger.info("Regenerating subtitle(s) from stored results...")
+        try:
+            for video, sub_info in self.video_queue.items():
+                sub_area, start_frame, stop_frame = sub_info[0], sub_info[1], sub_info[2]
+                start_frame = int(start_frame) if start_frame else start_frame
+                stop_frame = int(stop_frame) if stop_frame else stop_frame
+                self.sub_ex.regenerate_subtitle(video, sub_area, start_frame, stop_frame)
+        except Exception as error:
+            logger.exception(f"An error occurred while regenerating subtitles! \nError: {error}")
+        logger.info("Done regenerating subtitle(s)!\n")
+
     def _stop_sub_extraction_process(self) -> None:
         """
         Stop program from running.
@@ -865,6 +884,7 @@ class SubtitleExtractorGUI:
         """
         logger.debug("Setting gui state")
         self.file_menu.entryconfig(0, state=state)  # Open File button.
+        self.file_menu.entryconfig(1, state=state)  # Regenerate Subtitles button.
         self.menubar.entryconfig(1, state=state)  # Open View button.
         self.menubar.entryconfig(2, state=state)  # Preferences button.
 
@@ -898,6 +918,7 @@ class SubtitleExtractorGUI:
         utils.Process.stop_process()
         if not self.thread_running:
             self.clear_notifications()
+            shutdown_ocr_pool()
             self.root.quit()
 
 
@@ -1037,6 +1058,14 @@ class PreferencesUI(tk.Toplevel):
             variable=self.use_search_area
         ).grid(column=0, row=5)
 
+        self.use_sub_area_cache = tk.BooleanVar(value=utils.Config.use_sub_area_cache)
+        self.use_sub_area_cache.trace_add("write", self._set_reset_button)
+        ttk.Checkbutton(
+            subtitle_detection_frame,
+            text='Reuse Sub Area Of Series',
+            variable=self.use_sub_area_cache
+        ).grid(column=0, row=6)
+
     def _frame_extraction_tab(self) -> None:
         """
         Creates widgets in the Frame extraction preferences tab frame.
@@ -1071,6 +1100,71 @@ class PreferencesUI(tk.Toplevel):
             width=self.entry_size
         ).grid(column=1, row=1)
 
+        self.save_frames_to_disk = tk.BooleanVar(value=utils.Config.save_frames_to_disk)
+        self.save_frames_to_disk.trace_add("write", self._set_reset_button)
+        ttk.Checkbutton(
+            frame_extraction_frame,
+            text='Save Frames To Disk (Debug)',
+            variable=self.save_frames_to_disk
+        ).grid(column=0, row=2, pady=self.wgt_y_padding)
+
+        ttk.Label(frame_extraction_frame, text="Frame Queue Size:").grid(column=0, row=3)
+        self.frame_queue_size = tk.IntVar(value=utils.Config.frame_queue_size)
+        self.frame_queue_size.trace_add("write", self._set_reset_button)
+        ttk.Entry(
+            frame_extraction_frame,
+            textvariable=self.frame_queue_size,
+            validate='key',
+            validatecommand=check_int,
+            width=self.entry_size
+        ).grid(column=1, row=3)
+
+        ttk.Label(frame_extraction_frame, text="Frame Change Threshold:\n(0 sends every frame to OCR)").grid(
+            column=0, row=4, pady=self.wgt_y_padding
+        )
+        self.frame_change_threshold = tk.DoubleVar(value=utils.Config.frame_change_threshold)
+        self.frame_change_threshold.trace_add("write", self._set_reset_button)
+        ttk.Spinbox(
+            frame_extraction_frame,
+            from_=0, to=0.1,
+            increment=0.001,
+            textvariable=self.frame_change_threshold,
+            state="readonly",
+            width=self.spinbox_size
+        ).grid(column=1, row=4)
+
+        self.use_bisect_sampling = tk.BooleanVar(value=utils.Config.use_bisect_sampling)
+        self.use_bisect_sampling.trace_add("write", self._set_reset_button)
+        ttk.Checkbutton(
+            frame_extraction_frame,
+            text='Use Bisect Sampling',
+            variable=self.use_bisect_sampling
+        ).grid(column=0, row=5)
+
+        ttk.Label(frame_extraction_frame, text="Coarse Sampling Stride:\n(Used only with bisect sampling)").grid(
+            column=0, row=6, pady=self.wgt_y_padding
+        )
+        self.coarse_sampling_stride = tk.IntVar(value=utils.Config.coarse_sampling_stride)
+        self.coarse_sampling_stride.trace_add("write", self._set_reset_button)
+        ttk.Spinbox(
+            frame_extraction_frame,
+            from_=2, to=120,
+            textvariable=self.coarse_sampling_stride,
+            state="readonly",
+            width=self.spinbox_size
+        ).grid(column=1, row=6)
+
+        ttk.Label(frame_extraction_frame, text="Work Directory Root:\n(Empty uses the system temp directory)").grid(
+            column=0, row=7
+        )
+        self.work_dir_root = tk.StringVar(value=utils.Config.work_dir_root)
+        self.work_dir_root.trace_add("write", self._set_reset_button)
+        ttk.Entry(
+            frame_extraction_frame,
+            textvariable=self.work_dir_root,
+            width=self.entry_size
+        ).grid(column=1, row=7)
+
     def _text_extraction_tab(self) -> None:
         """
         Creates widgets in the Text extraction preferences tab frame.
@@ -1123,6 +1217,7 @@ class PreferencesUI(tk.Toplevel):
         )
         self.ocr_rec_language = tk.StringVar(value=utils.Config.ocr_rec_language)
         self.ocr_rec_language.trace_add("write", self._set_reset_button)
+        import custom_paddleocr.paddleocr as cp  # Imported here because it imports paddle.
         languages = list(cp.MODEL_URLS['OCR'][cp.DEFAULT_OCR_MODEL_VERSION]['rec'].keys())
         ttk.Combobox(
             text_extraction_frame,
@@ -1132,6 +1227,87 @@ class PreferencesUI(tk.Toplevel):
             width=self.combobox_size
         ).grid(column=1, row=3)
 
+        ttk.Label(text_extraction_frame, text="Text Detection Batch Size:").grid(
+            column=0, row=4, pady=self.wgt_y_padding
+        )
+        self.det_batch_size = tk.IntVar(value=utils.Config.det_batch_size)
+        self.det_batch_size.trace_add("write", self._set_reset_button)
+        ttk.Spinbox(
+            text_extraction_frame,
+            from_=1, to=64,
+            textvariable=self.det_batch_size,
+            state="readonly",
+            width=self.spinbox_size
+        ).grid(column=1, row=4)
+
+        self.use_line_finder = tk.BooleanVar(value=utils.Config.use_line_finder)
+        self.use_line_finder.trace_add("write", self._set_reset_button)
+        ttk.Checkbutton(
+            text_extraction_frame,
+            text='Find Text Lines Without Detection',
+            variable=self.use_line_finder
+        ).grid(column=0, row=5)
+
+        ttk.Label(text_extraction_frame, text="OCR Cache Size:\n(0 turns off the memory cache)").grid(
+            column=0, row=6, pady=self.wgt_y_padding
+        )
+        self.ocr_cache_size = tk.IntVar(value=utils.Config.ocr_cache_size)
+        self.ocr_cache_size.trace_add("write", self._set_reset_button)
+        ttk.Entry(
+            text_extraction_frame,
+            textvariable=self.ocr_cache_size,
+            validate='key',
+            validatecommand=check_int,
+            width=self.entry_size
+        ).grid(column=1, row=6)
+
+        self.use_ocr_disk_cache = tk.BooleanVar(value=utils.Config.use_ocr_disk_cache)
+        self.use_ocr_disk_cache.trace_add("write", self._set_reset_button)
+        ttk.Checkbutton(
+            text_extraction_frame,
+            text='Keep OCR Cache On Disk',
+            variable=self.use_ocr_disk_cache
+        ).grid(column=0, row=7)
+
+        self.use_blank_filter = tk.BooleanVar(value=utils.Config.use_blank_filter)
+        self.use_blank_filter.trace_add("write", self._set_reset_button)
+        ttk.Checkbutton(
+            text_extraction_frame,
+            text='Skip OCR Of Blank Frames',
+            variable=self.use_blank_filter
+        ).grid(column=0, row=8, pady=self.wgt_y_padding)
+
+        ttk.Label(text_extraction_frame, text="Blank Frame Audit Interval:").grid(column=0, row=9)
+        self.blank_audit_interval = tk.IntVar(value=utils.Config.blank_audit_interval)
+        self.blank_audit_interval.trace_add("write", self._set_reset_button)
+        ttk.Entry(
+            text_extraction_frame,
+            textvariable=self.blank_audit_interval,
+            validate='key',
+            validatecommand=check_int,
+            width=self.entry_size
+        ).grid(column=1, row=9)
+
+        self.use_temporal_det = tk.BooleanVar(value=utils.Config.use_temporal_det)
+        self.use_temporal_det.trace_add("write", self._set_reset_button)
+        ttk.Checkbutton(
+            text_extraction_frame,
+            text='Reuse Text Boxes Of Unchanged Layouts',
+            variable=self.use_temporal_det
+        ).grid(column=0, row=10, pady=self.wgt_y_padding)
+
+        ttk.Label(text_extraction_frame, text="Recognition Batch Size:").grid(column=0, row=11)
+        self.rec_batch_size = tk.IntVar(value=utils.Config.rec_batch_size)
+        self.rec_batch_size.trace_add("write", self._set_reset_button)
+        ttk.Spinbox(
+            text_extraction_frame,
+            from_=1, to=64,
+            increment=1,
+            textvariable=self.rec_batch_size,
+            state="readonly",
+            width=self.spinbox_size
+        ).grid(column=1, row=11)
+
     def _subtitle_generator_tab(self) -> None:
         """
         Creates widgets in the Subtitle generator preferences tab frame.
@@ -1193,6 +1369,14 @@ class PreferencesUI(tk.Toplevel):
             width=self.entry_size
         ).grid(column=1, row=3)
 
+        self.stream_subtitles = tk.BooleanVar(value=utils.Config.stream_subtitles)
+        self.stream_subtitles.trace_add("write", self._set_reset_button)
+        ttk.Checkbutton(
+            subtitle_generator_frame,
+            text='Write Subtitles During Extraction',
+            variable=self.stream_subtitles
+        ).grid(column=0, row=4, pady=self.wgt_y_padding)
+
     def _notifications_tab(self) -> None:
         """
         Choose notification tab depending on platform os.
@@ -1243,20 +1427,36 @@ class PreferencesUI(tk.Toplevel):
         default_values = (
             utils.Config.default_frame_extraction_frequency,
             utils.Config.default_frame_extraction_chunk_size,
+            utils.Config.default_save_frames_to_disk,
+            utils.Config.default_frame_queue_size,
+            utils.Config.default_frame_change_threshold,
+            utils.Config.default_use_bisect_sampling,
+            utils.Config.default_coarse_sampling_stride,
+            utils.Config.default_work_dir_root,
             utils.Config.default_text_extraction_chunk_size,
             utils.Config.default_ocr_gpu_max_processes,
             utils.Config.default_ocr_cpu_max_processes,
             utils.Config.default_ocr_rec_language,
+            utils.Config.default_det_batch_size,
+            utils.Config.default_use_line_finder,
+            utils.Config.default_ocr_cache_size,
+            utils.Config.default_use_ocr_disk_cache,
+            utils.Config.default_use_blank_filter,
+            utils.Config.default_blank_audit_interval,
+            utils.Config.default_use_temporal_det,
+            utils.Config.default_rec_batch_size,
             utils.Config.default_text_similarity_threshold,
             utils.Config.default_min_consecutive_sub_dur_ms,
             utils.Config.default_max_consecutive_short_durs,
             utils.Config.default_min_sub_duration_ms,
+            utils.Config.default_stream_subtitles,
             utils.Config.default_split_start,
             utils.Config.default_split_stop,
             utils.Config.default_no_of_frames,
             utils.Config.default_sub_area_x_rel_padding,
             utils.Config.default_sub_area_y_abs_padding,
             utils.Config.default_use_search_area,
+            utils.Config.default_use_sub_area_cache,
             utils.Config.default_win_notify_sound,
             utils.Config.default_win_notify_loop_sound
         )
@@ -1265,20 +1465,36 @@ class PreferencesUI(tk.Toplevel):
             values = (
                 self.frame_extraction_frequency.get(),
                 self.frame_extraction_chunk_size.get(),
+                self.save_frames_to_disk.get(),
+                self.frame_queue_size.get(),
+                self.frame_change_threshold.get(),
+                self.use_bisect_sampling.get(),
+                self.coarse_sampling_stride.get(),
+                self.work_dir_root.get(),
                 self.text_extraction_chunk_size.get(),
                 self.ocr_gpu_max_processes.get(),
                 self.ocr_cpu_max_processes.get(),
                 self.ocr_rec_language.get(),
+                self.det_batch_size.get(),
+                self.use_line_finder.get(),
+                self.ocr_cache_size.get(),
+                self.use_ocr_disk_cache.get(),
+                self.use_blank_filter.get(),
+                self.blank_audit_interval.get(),
+                self.use_temporal_det.get(),
+                self.rec_batch_size.get(),
                 self.text_similarity_threshold.get(),
                 self.min_consecutive_sub_dur_ms.get(),
                 self.max_consecutive_short_durs.get(),
                 self.min_sub_duration_ms.get(),
+                self.stream_subtitles.get(),
                 self.split_start.get(),
                 self.split_stop.get(),
                 self.no_of_frames.get(),
                 self.sub_area_x_rel_padding.get(),
                 self.sub_area_y_abs_padding.get(),
                 self.use_search_area.get(),
+                self.use_sub_area_cache.get(),
                 self.win_notify_sound.get(),
                 self.win_notify_loop_sound.get()
             )
@@ -1323,16 +1539,31 @@ class PreferencesUI(tk.Toplevel):
         # Frame extraction settings.
         self.frame_extraction_frequency.set(utils.Config.default_frame_extraction_frequency)
         self.frame_extraction_chunk_size.set(utils.Config.default_frame_extraction_chunk_size)
+        self.save_frames_to_disk.set(utils.Config.default_save_frames_to_disk)
+        self.frame_queue_size.set(utils.Config.default_frame_queue_size)
+        self.frame_change_threshold.set(utils.Config.default_frame_change_threshold)
+        self.use_bisect_sampling.set(utils.Config.default_use_bisect_sampling)
+        self.coarse_sampling_stride.set(utils.Config.default_coarse_sampling_stride)
+        self.work_dir_root.set(utils.Config.default_work_dir_root)
         # Text extraction settings.
         self.text_extraction_chunk_size.set(utils.Config.default_text_extraction_chunk_size)
         self.ocr_gpu_max_processes.set(utils.Config.default_ocr_gpu_max_processes)
         self.ocr_cpu_max_processes.set(utils.Config.default_ocr_cpu_max_processes)
         self.ocr_rec_language.set(utils.Config.default_ocr_rec_language)
+        self.det_batch_size.set(utils.Config.default_det_batch_size)
+        self.use_line_finder.set(utils.Config.default_use_line_finder)
+        self.ocr_cache_size.set(utils.Config.default_ocr_cache_size)
+        self.use_ocr_disk_cache.set(utils.Config.default_use_ocr_disk_cache)
+        self.use_blank_filter.set(utils.Config.default_use_blank_filter)
+        self.blank_audit_interval.set(utils.Config.default_blank_audit_interval)
+        self.use_temporal_det.set(utils.Config.default_use_temporal_det)
+        self.rec_batch_size.set(utils.Config.default_rec_batch_size)
         # Subtitle generator settings.
         self.text_similarity_threshold.set(utils.Config.default_text_similarity_threshold)
         self.min_consecutive_sub_dur_ms.set(utils.Config.default_min_consecutive_sub_dur_ms)
         self.max_consecutive_short_durs.set(utils.Config.default_max_consecutive_short_durs)
         self.min_sub_duration_ms.set(utils.Config.default_min_sub_duration_ms)
+        self.stream_subtitles.set(utils.Config.default_stream_subtitles)
         # Subtitle detection settings.
         self.split_start.set(utils.Config.default_split_start)
         self.split_stop.set(utils.Config.default_split_stop)
@@ -1340,6 +1571,7 @@ class PreferencesUI(tk.Toplevel):
         self.sub_area_x_rel_padding.set(utils.Config.default_sub_area_x_rel_padding)
         self.sub_area_y_abs_padding.set(utils.Config.default_sub_area_y_abs_padding)
         self.use_search_area.set(utils.Config.default_use_search_area)
+        self.use_sub_area_cache.set(utils.Config.default_use_sub_area_cache)
         # Notification settings.
         self.win_notify_sound.set(utils.Config.default_win_notify_sound)
         self.win_notify_loop_sound.set(utils.Config.default_win_notify_loop_sound)
@@ -1354,16 +1586,31 @@ class PreferencesUI(tk.Toplevel):
                     # Frame extraction settings.
                     utils.Config.keys[0]: self.frame_extraction_frequency.get(),
                     utils.Config.keys[1]: self.frame_extraction_chunk_size.get(),
+                    utils.Config.keys[18]: self.save_frames_to_disk.get(),
+                    utils.Config.keys[19]: self.frame_queue_size.get(),
+                    utils.Config.keys[20]: self.frame_change_threshold.get(),
+                    utils.Config.keys[21]: self.use_bisect_sampling.get(),
+                    utils.Config.keys[22]: self.coarse_sampling_stride.get(),
+                    utils.Config.keys[33]: self.work_dir_root.get(),
                     # Text extraction settings.
                     utils.Config.keys[2]: self.text_extraction_chunk_size.get(),
                     utils.Config.keys[3]: self.ocr_gpu_max_processes.get(),
                     utils.Config.keys[17]: self.ocr_cpu_max_processes.get(),
                     utils.Config.keys[4]: self.ocr_rec_language.get(),
+                    utils.Config.keys[23]: self.det_batch_size.get(),
+                    utils.Config.keys[24]: self.use_line_finder.get(),
+                    utils.Config.keys[25]: self.ocr_cache_size.get(),
+                    utils.Config.keys[26]: self.use_ocr_disk_cache.get(),
+                    utils.Config.keys[28]: self.use_blank_filter.get(),
+                    utils.Config.keys[29]: self.blank_audit_interval.get(),
+                    utils.Config.keys[30]: self.use_temporal_det.get(),
+                    utils.Config.keys[31]: self.rec_batch_size.get(),
                     # Subtitle generator settings.
                     utils.Config.keys[5]: self.text_similarity_threshold.get(),
                     utils.Config.keys[6]: self.min_consecutive_sub_dur_ms.get(),
                     utils.Config.keys[7]: self.max_consecutive_short_durs.get(),
                     utils.Config.keys[8]: self.min_sub_duration_ms.get(),
+                    utils.Config.keys[27]: self.stream_subtitles.get(),
                     # Subtitle detection settings.
                     utils.Config.keys[9]: self.split_start.get(),
                     utils.Config.keys[10]: self.split_stop.get(),
@@ -1371,6 +1618,7 @@ class PreferencesUI(tk.Toplevel):
                     utils.Config.keys[12]: self.sub_area_x_rel_padding.get(),
                     utils.Config.keys[13]: self.sub_area_y_abs_padding.get(),
                     utils.Config.keys[14]: self.use_search_area.get(),
+                    utils.Config.keys[32]: self.use_sub_area_cache.get(),
                     # Notification settings.
                     utils.Config.keys[15]: self.win_notify_sound.get(),
                     utils.Config.keys[16]: self.win_notify_loop_sound.get()
@@ -1,16 +1,21 @@
 import logging
-import shutil
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 from datetime import timedelta
-from difflib import SequenceMatcher
-from itertools import pairwise
 from pathlib import Path
+from typing import Iterator
 
 import cv2 as cv
 
+import utilities.segments as segments
 import utilities.utils as utils
-from utilities.frames_to_text import extract_bboxes, frames_to_text
+from utilities.frames_to_text import extract_bboxes, frames_to_text, get_max_processes, get_text_detector, video_to_text
 from utilities.logger_setup import setup_logging
-from utilities.video_to_frames import extract_frames, video_to_frames
+from utilities.results_store import ResultsStore, results_key
+from utilities.segments import Segments, SegmentStream
+from utilities.similarity import similarity
+from utilities.sub_area import (VERIFY_SAMPLES, SubAreaCache, change_map, find_text_area, fits_text_area,
+                                series_key, text_heatmap)
+from utilities.video_to_frames import read_frame_samples, video_to_frames
 
 logger = logging.getLogger(__name__)
 
@@ -27,44 +32,44 @@ class SubtitleDetector:
         self.use_search_area = use_search_area
         self.sub_ex = SubtitleExtractor()
         self.fps, self.frame_total, self.frame_width, self.frame_height = self.sub_ex.video_details(self.video_file)
-        self.vd_output_dir = Path(__file__).parent / "output"  # Create cache directory.
-        self.frame_output = self.vd_output_dir / "sub detect frames"  # Extracted video frame storage directory.
 
-    def _get_key_frames(self) -> None:
+    def _read_samples(self, no_of_samples: int) -> list:
         """
-        Extract frames from default subtitle area of video that should contain subtitles.
+        Read frames spread evenly across the part of the video between the splits, the whole video by default.
+        Each sample is in the middle of an equal part, so the often black first and last frames are skipped.
+        Only the default sub area of the frames is kept when it's used as search area.
         """
         # Decimal used to signify the relative position to choose start point to search for frames.
         split_start = utils.Config.split_start
         # Decimal used to signify the relative position to choose end point to search for frames.
         split_stop = utils.Config.split_stop
-        # How many frames to look through after splits.
-        no_of_frames = utils.Config.no_of_frames
 
         relative_start, relative_stop = int(self.frame_total * split_start), int(self.frame_total * split_stop)
         logger.debug(f"Relative start frame = {relative_start}, Relative stop frame = {relative_stop}")
-        # Split the frames into chunk lists.
-        frame_chunks = [[i, i + no_of_frames] for i in range(relative_start, relative_stop)]
-        frame_chunks_len = len(frame_chunks)
-        logger.debug(f"Frame total = {self.frame_total}, Chunk length = {frame_chunks_len}")
         start_duration = self.sub_ex.frame_no_to_duration(relative_start, self.fps)
         stop_duration = self.sub_ex.frame_no_to_duration(relative_stop, self.fps)
         logger.info(f"Split Start = {start_duration}, Split Stop = {stop_duration}")
-        if frame_chunks_len > 3:
-            middle_chunk = int(frame_chunks_len / 2)
-            frame_chunks = [frame_chunks[0], frame_chunks[middle_chunk], frame_chunks[-1]]
-        last_frame_chunk = frame_chunks[-1][-1]
-        if last_frame_chunk > self.frame_total:
-            frame_chunks[-1][-1] = relative_stop
-        logger.debug(f"Frame chunks = {frame_chunks}")
+        sample_step = max(1, relative_stop - relative_start) / no_of_samples
+        sample_frames = sorted({relative_start + int((i + 0.5) * sample_step) for i in range(no_of_samples)})
+        logger.debug(f"Frame total = {self.frame_total}, Sample frames = {sample_frames}")
         # Part of the video to look for subtitles.
         if self.use_search_area:
             logger.info("Default sub area is being used as search area.")
             search_area = self.sub_ex.default_sub_area(self.frame_width, self.frame_height)
         else:
             search_area = None
-        for frames in frame_chunks:
-            extract_frames(self.video_file, self.frame_output, search_area, frames[0], frames[1], int(self.fps))
+        return read_frame_samples(self.video_file, search_area, sample_frames)
+
+    def _get_key_frames(self) -> list:
+        """
+        Extract frames from default subtitle area of video that should contain subtitles.
+        The frames are sampled across the part of the video between the splits and kept in memory.
+        """
+        # How many frames to look through after splits.
+        no_of_frames = utils.Config.no_of_frames
+        # As many samples as one frame per second from three runs of no_of_frames frames, spread evenly
+        # between the splits. Intro or credit text is in few samples, so the subtitle text outweighs it.
+        return self._read_samples(max(1, 3 * no_of_frames // max(1, int(self.fps))))
 
     def _pad_sub_area(self, top_left: tuple, bottom_right: tuple) -> tuple:
         """
@@ -96,35 +101,17 @@ class SubtitleDetector:
         else:
             return top_left, bottom_right
 
-    def _empty_cache(self) -> None:
+    def verify_sub_area(self, sub_area: tuple) -> bool:
         """
-        Delete all cache files produced during subtitle extraction.
+        Check that the subtitles of the video are in the sub area found for another video of the same series.
+        Only a few frames are detected, instead of the many needed to find the sub area.
         """
-        if self.vd_output_dir.exists():
-            logger.debug("Emptying cache...")
-            shutil.rmtree(self.vd_output_dir)
-
-    @staticmethod
-    def _get_max_boundaries(bboxes: list) -> tuple:
-        """
-        Look through all the boundary boxes and use the max value to increase the new boundary size.
-        """
-        new_top_left_x = new_top_left_y = new_bottom_right_x = new_bottom_right_y = None
-        for bbox in bboxes:
-            top_left_x = int(bbox[0][0])
-            top_left_y = int(bbox[0][1])
-            bottom_right_x = int(bbox[2][0])
-            bottom_right_y = int(bbox[2][1])
-
-            if not new_top_left_x or top_left_x < new_top_left_x:
-                new_top_left_x = top_left_x
-            if not new_top_left_y or top_left_y < new_top_left_y:
-                new_top_left_y = top_left_y
-            if not new_bottom_right_x or bottom_right_x > new_bottom_right_x:
-                new_bottom_right_x = bottom_right_x
-            if not new_bottom_right_y or bottom_right_y > new_bottom_right_y:
-                new_bottom_right_y = bottom_right_y
-        return (new_top_left_x, new_top_left_y), (new_bottom_right_x, new_bottom_right_y)
+        x1, y1, x2, y2 = sub_area
+        y = int(self.frame_height * utils.Config.subarea_height_scaler) if self.use_search_area else 0
+        frame_boxes = extract_bboxes(self._read_samples(VERIFY_SAMPLES))
+        verified = fits_text_area(frame_boxes, (x1, y1 - y, x2, y2 - y))
+        logger.info(f"Series sub area {sub_area} {'fits' if verified else 'does not fit'} {Path(self.video_file).name}")
+        return verified
 
     def get_sub_area(self) -> tuple | None:
         """
@@ -134,36 +121,103 @@ class SubtitleDetector:
         if not video_path.exists() or not video_path.is_file():
             logger.error(f"Video file: {video_path.name} ...could not be found!\n")
             return
-        self._empty_cache()  # Empty cache at the beginning of program run before it recreates itself.
-        if not self.frame_output.exists():
-            self.frame_output.mkdir(parents=True)
-
         logger.info(f"Video name: {video_path.name}")
-        self._get_key_frames()
-        bboxes = extract_bboxes(self.frame_output)
+        key_frames = self._get_key_frames()
+        text_area = None
+        if key_frames:
+            heatmap = text_heatmap(key_frames[0].shape, extract_bboxes(key_frames))
+            text_area = find_text_area(heatmap, change_map(key_frames))
         new_sub_area = None
-        if bboxes:
-            top_left, bottom_right = self._get_max_boundaries(bboxes)
+        if text_area:
+            top_left, bottom_right = text_area[:2], text_area[2:]
             top_left, bottom_right = self._pad_sub_area(top_left, bottom_right)
             top_left, bottom_right = self._reposition_sub_area(top_left, bottom_right)
             new_sub_area = top_left[0], top_left[1], bottom_right[0], bottom_right[1]
 
         logger.info(f"New sub area = {new_sub_area}\n")
-        self._empty_cache()
         return new_sub_area
 
 
+def detect_sub_area(video_file: str, use_search_area: bool,
+                    series_sub_area: tuple | None = None) -> tuple[tuple | None, bool]:
+    """
+    Detect the sub area of one video, used by the detection worker processes.
+    :param video_file: The path like string of the video file.
+    :param use_search_area: Whether to use the default search area or the full video images.
+    :param series_sub_area: Sub area of another video of the same series, reused when the subtitles fit in it.
+    :return: The sub area and whether it's the reused series sub area.
+    """
+    sub_dt = SubtitleDetector(video_file, use_search_area)
+    if series_sub_area and sub_dt.verify_sub_area(series_sub_area):
+        return series_sub_area, True
+    return sub_dt.get_sub_area(), False
+
+
+def detect_sub_areas(video_files: list, use_search_area: bool) -> Iterator[tuple[str, tuple | None]]:
+    """
+    Detect the sub areas of the videos in parallel, one video per worker process at a time.
+    Each worker loads only the text detector, once when it starts, and keeps it for every video it's given.
+    When the sub area cache is used, videos of a series with a known sub area only check a few frames.
+    The other videos of a series wait for the first one, so they can check its sub area.
+    Videos that are still waiting are cancelled when the iteration is stopped early.
+    :param video_files: The path like strings of the video files.
+    :param use_search_area: Whether to use the default search area or the full video images.
+    :return: The video file and its sub area, in the order the videos finish.
+    """
+    processes = max(1, min(len(video_files), get_max_processes()))
+    logger.debug(f"Detecting sub areas of {len(video_files)} video(s) with {processes} process(es)")
+    cache = SubAreaCache() if utils.Config.use_sub_area_cache else None
+    executor = ProcessPoolExecutor(processes, initializer=get_text_detector)
+    futures, waiting_videos, no_of_reused = {}, {}, 0
+
+    def submit(video: str, key: str | None, series_sub_area: tuple | None) -> None:
+        futures[executor.submit(detect_sub_area, video, use_search_area, series_sub_area)] = video, key
+
+    try:
+        for video in video_files:
+            key = series_key(video, use_search_area) if cache else None
+            series_sub_area = cache.get(key) if key else None
+            if key is None or series_sub_area:
+                submit(video, key, series_sub_area)
+            elif key in waiting_videos:  # The first video of the series is being detected.
+                waiting_videos[key].append(video)
+            else:
+                waiting_videos[key] = []
+                submit(video, key, None)
+        while futures:
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                video, key = futures.pop(future)
+                try:
+                    sub_area, reused = future.result()
+                except Exception as error:
+                    logger.exception(f"An error occurred while detecting the sub area of {video}! \nError: {error}")
+                    sub_area = reused = None
+                if key and sub_area and not reused:
+                    cache.put(key, sub_area)
+                for waiting_video in waiting_videos.pop(key, []):
+                    submit(waiting_video, key, sub_area)
+                if reused is not None:
+                    no_of_reused += reused
+                    yield video, sub_area
+        if cache:
+            logger.info(f"Series sub areas reused for {no_of_reused} of {len(video_files)} video(s)")
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
 class SubtitleExtractor:
     def __init__(self) -> None:
         """
         Extracts hardcoded subtitles from video.
         """
         self.video_path = None
-        self.subtitle_texts = {}
-        self.divider = "--"  # Characters for separating time durations(ms) in key name.
-        self.vd_output_dir = Path(__file__).parent / "output"  # Create cache directory.
-        # Extracted video frame storage directory. Extracted text file storage directory.
-        self.frame_output, self.text_output = self.vd_output_dir / "frames", self.vd_output_dir / "extracted texts"
+        self.segments = Segments()
+        self.cache_hits = self.cache_misses = 0  # Ocr cache stats of the last run.
+        self.results_store = None
+        self.segment_stream = self.subtitle_file = self.subtitle_path = None
+        self.subtitle_line_code = 0  # Line code of the last subtitle line written by the subtitle stream.
+        self.frame_output = None  # Extracted video frame storage directory, inside the work directory of the job.
 
     @staticmethod
     def video_details(video_path: str) -> tuple:
@@ -196,62 +250,16 @@ class SubtitleExtractor:
         duration = self.timecode(frame_no_to_ms).replace(",", ":")
         return duration
 
-    def _empty_cache(self) -> None:
-        """
-        Delete all cache files and dictionary content produced during subtitle extraction.
-        """
-        if self.vd_output_dir.exists():
-            logger.debug("Emptying cache...")
-            shutil.rmtree(self.vd_output_dir)
-            self.subtitle_texts = {}
-
     def merge_adjacent_equal_texts(self) -> None:
         """
         Merge texts that are beside each other and are the exact same.
-        Use divider for duration in text name.
         """
         logger.debug("Merging adjacent equal texts")
-        new_subtitle_dict, starting_key, no_of_keys = {}, None, len(self.subtitle_texts)
-        for index, (key1, key2) in enumerate(pairwise(self.subtitle_texts.items()), start=2):
-            key1_name, key1_text, key2_name, key2_text = key1[0], key1[1], key2[0], key2[1]
-            # print(index, no_of_keys, key1_name, key1_text, key2_name, key2_text)
-            if key1_text == key2_text and index != no_of_keys:
-                if not starting_key:
-                    starting_key = key1_name
-            else:
-                # print("Text not equal\n")
-                if not starting_key:  # This condition is used when the key doesn't match the previous or next key.
-                    starting_key = key1_name
-                duration = f"{starting_key}{self.divider}{key1_name}"
-                new_subtitle_dict[duration] = key1_text
-                if index == no_of_keys:  # The last key is always added to end of dictionary to avoid being skipped.
-                    # print("No of keys reached!")
-                    duration = f"{key2_name}{self.divider}{key2_name}"
-                    new_subtitle_dict[duration] = key2_text
-                starting_key = None
-        self.subtitle_texts = new_subtitle_dict
+        self.segments = segments.merge_adjacent_equal_texts(self.segments)
 
     @staticmethod
-    def similarity(text1: str, text2: str) -> float:
-        return SequenceMatcher(a=text1, b=text2).quick_ratio()
-
-    def similar_text_name_gen(self, start_name: str, end_name: str) -> str:
-        """
-        Takes 2 name durations and creates a new name.
-        """
-        start_name, end_name = start_name.split(self.divider)[0], end_name.split(self.divider)[1]
-        new_name = f"{start_name}{self.divider}{end_name}"
-        return new_name
-
-    def name_to_duration(self, name: str) -> float:
-        """
-        Takes a name with two numbers and subtracts to get the duration in milliseconds.
-        :param name: Name numbers should be separated by divider.
-        :return: Duration
-        """
-        name_timecode = name.split(self.divider)
-        duration = float(name_timecode[1]) - float(name_timecode[0])
-        return duration
+    def similarity(text1: str, text2: str, cutoff: float = 0.0) -> float:
+        return similarity(text1, text2, cutoff)
 
     def merge_adjacent_similar_texts(self) -> None:
         """
@@ -260,91 +268,31 @@ class SubtitleExtractor:
         """
         logger.debug("Merging adjacent similar texts")
         similarity_threshold = utils.Config.text_similarity_threshold  # Cut off point to determine similarity.
-        new_subtitle_dict, no_of_keys = {}, len(self.subtitle_texts)
-        starting_key = starting_key_txt = starting_key_dur = None
-        for index, (key1, key2) in enumerate(pairwise(self.subtitle_texts.items()), start=2):
-            key1_name, key1_txt, key1_dur = key1[0], key1[1], self.name_to_duration(key1[0])
-            key2_name, key2_txt, key2_dur = key2[0], key2[1], self.name_to_duration(key2[0])
-            similarity = self.similarity(key1_txt, key2_txt)
-            # print(f"Index: {index}, No of Keys: {no_of_keys}\n"
-            #       f"Key 1 Name: {key1_name}, Duration: {key1_dur}, Text: {key1_txt}\n"
-            #       f"Key 2 Name: {key2_name}, Duration: {key2_dur}, Text: {key2_txt}\n"
-            #       f"Key 1 & 2 Similarity: {similarity}")
-            if similarity >= similarity_threshold and index != no_of_keys:
-                if not starting_key:
-                    starting_key, starting_key_txt, starting_key_dur = key1_name, key1_txt, key1_dur
-
-                if key2_dur > starting_key_dur:  # Change text and duration when longer duration is found.
-                    # print(f"--- Longer duration found: {key2_dur} ---")
-                    starting_key_txt, starting_key_dur = key2_txt, key2_dur
-            else:
-                if not starting_key:  # This condition is used when the key doesn't match the previous or next key.
-                    starting_key, starting_key_txt = key1_name, key1_txt
-
-                if index == no_of_keys:
-                    # print("No of keys reached!")
-                    ending_key = key2_name  # This doesn't work well when the last key's text is not similar.
-                else:
-                    ending_key = key1_name
-
-                new_key_name = self.similar_text_name_gen(starting_key, ending_key)
-                # print(f"New key name: {new_key_name} \nNew key text: {starting_key_txt}\n")
-                new_subtitle_dict[new_key_name] = starting_key_txt
-                starting_key = starting_key_txt = starting_key_dur = None
-        self.subtitle_texts = new_subtitle_dict
-
-    def delete_keys(self, keys: set) -> None:
-        """
-        Delete all key durations in the set if they exist.
-        """
-        for key in keys:
-            if key in self.subtitle_texts:
-                del self.subtitle_texts[key]
+        self.segments = segments.merge_adjacent_similar_texts(self.segments, similarity_threshold, self.similarity)
 
     def remove_short_duration_consecutive_subs(self) -> None:
         """
-        Deletes keys that contain subtitles that have durations that are shorter than the given minimum duration
+        Deletes subtitles that have durations that are shorter than the given minimum duration
         in the given number of consecutive rows.
         """
         logger.debug("Removing short duration consecutive subs")
-        # Minimum allowed consecutive duration in milliseconds.
-        min_consecutive_sub_dur = utils.Config.min_consecutive_sub_dur_ms
-        # Maximum allowed number of short durations in a row.
-        max_consecutive_short_durs = utils.Config.max_consecutive_short_durs
-
-        keys_for_deletion, short_dur_keys, no_of_keys = set(), set(), len(self.subtitle_texts)
-        for index, (dur_1, dur_2) in enumerate(pairwise(self.subtitle_texts), start=2):
-            key1_dur, key2_dur = self.name_to_duration(dur_1), self.name_to_duration(dur_2)
-            # print(f"Index: {index}, No of Keys: {no_of_keys}\n"
-            #       f"Key 1 Name: {dur_1}, Duration: {key1_dur}\n"
-            #       f"Key 2 Name: {dur_2}, Duration: {key2_dur}")
-            if key1_dur < min_consecutive_sub_dur and key2_dur < min_consecutive_sub_dur and index != no_of_keys:
-                short_dur_keys.add(dur_1)
-                short_dur_keys.add(dur_2)
-            else:
-                if len(short_dur_keys) >= max_consecutive_short_durs:
-                    # print(f"Short durations found for deletion! Keys: ({len(short_dur_keys)}) = {short_dur_keys}\n")
-                    keys_for_deletion.update(short_dur_keys)
-                short_dur_keys = set()
-        self.delete_keys(keys_for_deletion)
+        self.segments = segments.remove_short_duration_consecutive_subs(
+            self.segments,
+            utils.Config.min_consecutive_sub_dur_ms,  # Minimum allowed consecutive duration in milliseconds.
+            utils.Config.max_consecutive_short_durs  # Maximum allowed number of short durations in a row.
+        )
 
     def remove_short_duration_subs(self) -> None:
         """
-        Deletes keys that contain subtitles that have durations that are shorter than the minimum duration.
+        Deletes subtitles that have durations that are shorter than the minimum duration.
         """
         logger.debug("Removing short duration subs")
         # Minimum allowed time in milliseconds.
-        min_sub_duration = utils.Config.min_sub_duration_ms
-        short_dur_keys = set()
-        for ms_duration in self.subtitle_texts:
-            duration = self.name_to_duration(ms_duration)
-            if duration <= min_sub_duration:
-                short_dur_keys.add(ms_duration)
-        self.delete_keys(short_dur_keys)
+        self.segments = segments.remove_short_duration_subs(self.segments, utils.Config.min_sub_duration_ms)
 
     def process_extracted_texts(self) -> None:
         """
-        Process extracted texts in dictionary.
+        Process the extracted text segments.
         """
         logger.debug("Processing extracted texts...")
         self.merge_adjacent_equal_texts()
@@ -367,7 +315,7 @@ class SubtitleExtractor:
 
     def generate_subtitle(self) -> list:
         """
-        Use processed text files in dictionary to create subtitle file.
+        Use the processed text segments to create subtitle file.
         """
         # Cancel if process has been cancelled by gui.
         if utils.Process.interrupt_process:
@@ -375,25 +323,31 @@ class SubtitleExtractor:
             return []
 
         logger.info("Generating subtitle...")
+        subtitles = self.subtitle_lines(self.segments, 1)
+        logger.info("Subtitle generated!")
+        return subtitles
+
+    def subtitle_lines(self, subtitle_segments: Segments | list, first_line_code: int) -> list:
+        """
+        Create the subtitle lines of the text segments.
+        :param subtitle_segments: The start time, end time and text of each segment.
+        :param first_line_code: Line code of the first segment.
+        """
         subtitles = []
-        for line_code, (ms_dur, txt) in enumerate(self.subtitle_texts.items(), start=1):
-            key_name = ms_dur.split(self.divider)
-            frame_start, frame_end = self.timecode(float(key_name[0])), self.timecode(float(key_name[1]))
+        for line_code, (start_ms, end_ms, txt) in enumerate(subtitle_segments, start=first_line_code):
+            frame_start, frame_end = self.timecode(start_ms), self.timecode(end_ms)
             subtitle_line = f"{line_code}\n{frame_start} --> {frame_end}\n{txt}\n\n"
             subtitles.append(subtitle_line)
-        logger.info("Subtitle generated!")
         return subtitles
 
     def load_extracted_texts(self) -> None:
         """
-        Load extracted texts files into dictionary. The name of the file which represents the duration in milliseconds
-        will be the key and text of the file will be the value.
-        The files will be sorted before being added to the dict, this prevents the need for sorting again.
+        Load extracted texts from the results store into segments. Each frame with text becomes a segment that
+        starts and ends at the frame position in milliseconds.
+        The texts are sorted by frame position, this prevents the need for sorting again.
         """
         logger.debug("Loading extracted tests...")
-        for file in sorted(self.text_output.iterdir(), key=lambda name: float(name.stem)):
-            if file_text := file.read_text(encoding="utf-8"):
-                self.subtitle_texts[file.stem] = file_text
+        self.segments = Segments.from_frames(*self.results_store.texts())
 
     def gen_sub_file_name(self) -> Path:
         """
@@ -427,32 +381,157 @@ class SubtitleExtractor:
         logger.info(f"Subtitle file saved. Path: {save_path}")
         return save_path
 
-    def get_frames_and_texts(self, sub_area: tuple, start_frame: int | None, stop_frame: int | None) -> None:
+    def _start_subtitle_stream(self) -> None:
+        """
+        Start writing the subtitle while the texts are being extracted.
+        """
+        self.segment_stream = SegmentStream(
+            utils.Config.text_similarity_threshold,
+            self.similarity,
+            utils.Config.min_consecutive_sub_dur_ms,
+            utils.Config.max_consecutive_short_durs,
+            utils.Config.min_sub_duration_ms
+        )
+        self.subtitle_file = self.subtitle_path = None
+        self.subtitle_line_code = 0
+
+    def _write_subtitle_segments(self, subtitle_segments: list) -> None:
+        """
+        Append finished segments to the subtitle file. The file is created when the first segment is finished.
+        """
+        if not subtitle_segments:
+            return
+        if not self.subtitle_file:
+            self.subtitle_path = self.gen_sub_file_name()
+            self.subtitle_file = open(self.subtitle_path, 'w', encoding="utf-8")
+            logger.info(f"Writing subtitle file during extraction. Path: {self.subtitle_path}")
+        self.subtitle_file.writelines(self.subtitle_lines(subtitle_segments, self.subtitle_line_code + 1))
+        self.subtitle_file.flush()  # Lets the subtitle file be watched while it grows.
+        self.subtitle_line_code += len(subtitle_segments)
+
+    def _stream_record(self, frame_position: float, record: tuple) -> None:
+        """
+        Give the ocr record of the next frame to the subtitle stream.
+        """
+        if text := record[0]:
+            self._write_subtitle_segments(self.segment_stream.add(frame_position, text))
+
+    def _finish_subtitle_stream(self, completed: bool) -> Path | None:
+        """
+        Write the remaining segments and close the subtitle file.
+        The subtitle file is deleted if the extraction didn't complete.
+        :return: The save path of the subtitle.
+        """
+        if completed:
+            self._write_subtitle_segments(self.segment_stream.finish())
+        save_path, self.segment_stream = self.subtitle_path, None
+        if self.subtitle_file:
+            self.subtitle_file.close()
+        self.subtitle_file = self.subtitle_path = None
+        if not completed:
+            logger.warning("Subtitle generation process interrupted!")
+            if save_path:
+                save_path.unlink(missing_ok=True)
+            return
+        if not save_path:
+            logger.debug(f"No lines in subtitles generated. Name: {self.video_path.name}")
+            return
+        logger.info(f"Subtitle file saved. Path: {save_path}")
+        return save_path
+
+    def get_frames_and_texts(self, sub_area: tuple, start_frame: int | None, stop_frame: int | None) -> bool:
         """
         Get the frames and the images from the video by calling external functions.
+        The results are stored when the extraction completes, so the subtitle can be regenerated from them.
+        The texts are given to the subtitle stream as they are extracted if it has been started.
+        :return: Whether the extraction completed.
         """
+        on_record = self._stream_record if self.segment_stream else None
         try:
-            video_to_frames(str(self.video_path), self.frame_output, sub_area, start_frame, stop_frame)
-            frames_to_text(self.frame_output, self.text_output)
+            if utils.Config.save_frames_to_disk:  # Debug mode, frames are kept in the work directory of the job.
+                video_to_frames(str(self.video_path), self.frame_output, sub_area, start_frame, stop_frame)
+                self.cache_hits, self.cache_misses = frames_to_text(self.frame_output, self.results_store)
+                assert len(list(self.frame_output.iterdir())) == self.results_store.no_of_added_records
+            else:
+                self.cache_hits, self.cache_misses = video_to_text(str(self.video_path), self.results_store,
+                                                                   sub_area, start_frame, stop_frame, on_record)
+            if utils.Process.interrupt_process:
+                self.results_store.discard()
+                return False
+            self.results_store.save()
+            return True
         except Exception as error:
+            self.results_store.discard()
             logger.exception(f"An error occurred during frame & text extraction! \nError: {error}")
-        assert len(list(self.frame_output.iterdir())) == len(list(self.text_output.iterdir()))
+            return False
 
-    def run_extraction(self, video_path: str, sub_area: tuple = None, start_frame: int = None,
-                       stop_frame: int = None) -> Path | None:
+    def _set_results_store(self, sub_area: tuple, start_frame: int | None, stop_frame: int | None) -> bool:
         """
-        Run through the steps of extracting texts from subtitle area in video to create subtitle.
+        Set the results store of the current video.
+        :return: Whether the store already has the results of the video.
+        """
+        key = results_key(str(self.video_path), sub_area, start_frame, stop_frame, utils.Config.ocr_model_version,
+                          utils.Config.ocr_rec_language)
+        self.results_store = ResultsStore(key)
+        return self.results_store.load()
+
+    def regenerate_subtitle(self, video_path: str, sub_area: tuple = None, start_frame: int = None,
+                            stop_frame: int = None) -> Path | None:
+        """
+        Create the subtitle again from the stored results of a previous extraction, without extracting any frames.
+        Used after changing the subtitle generator settings.
         """
         self.video_path = Path(video_path)
         if not self.video_path.exists() or not self.video_path.is_file():
             logger.error(f"Video file: {self.video_path.name} ...could not be found!\n")
             return
-        self._empty_cache()  # Empty cache at the beginning of program run before it recreates itself.
-        # If the directories do not exist, create the directories.
-        self.frame_output.mkdir(parents=True)
-        self.text_output.mkdir(parents=True)
+        _, _, frame_width, frame_height = self.video_details(video_path)
+        sub_area = sub_area or self.default_sub_area(frame_width, frame_height)
+        if not self._set_results_store(sub_area, start_frame, stop_frame):
+            logger.warning(f"No stored results for {self.video_path.name}, the subtitle has to be extracted first.")
+            return
+        return self.generate_stored_subtitle()
+
+    def generate_stored_subtitle(self) -> Path | None:
+        """
+        Create the subtitle from the loaded results store, after all the texts have been extracted.
+        """
+        self.load_extracted_texts()
+        self.process_extracted_texts()
+        subtitles = self.generate_subtitle()
+        return self.save_subtitle(subtitles)
 
-        fps, frame_total, frame_width, frame_height = self.video_details(video_path)
+    def run_extraction(self, video_path: str, sub_area: tuple = None, start_frame: int = None,
+                       stop_frame: int = None) -> Path | None:
+        """
+        Run through the steps of extracting texts from subtitle area in video to create subtitle.
+        Only one extraction runs at a time, a call made while another one is running waits for it to finish.
+        """
+        with utils.Process.job_lock:
+            self.video_path = Path(video_path)
+            if not self.video_path.exists() or not self.video_path.is_file():
+                logger.error(f"Video file: {self.video_path.name} ...could not be found!\n")
+                return
+            self.segments = Segments()
+            self.cache_hits = self.cache_misses = 0
+            # Each job gets a directory of its own, so jobs of separate program runs don't touch each other's frames.
+            work_dir = utils.job_work_dir() if utils.Config.save_frames_to_disk else None
+            try:
+                if work_dir:
+                    self.frame_output = Path(work_dir.name) / "frames"
+                    self.frame_output.mkdir()
+                return self._extract_subtitle(sub_area, start_frame, stop_frame)
+            finally:
+                if work_dir:
+                    work_dir.cleanup()
+                    self.frame_output = None
+
+    def _extract_subtitle(self, sub_area: tuple | None, start_frame: int | None,
+                          stop_frame: int | None) -> Path | None:
+        """
+        Extract the texts of the current video, or load its stored results, and create the subtitle.
+        """
+        fps, frame_total, frame_width, frame_height = self.video_details(str(self.video_path))
         sub_area = sub_area or self.default_sub_area(frame_width, frame_height)
 
         logger.info(f"File Path: {self.video_path}\n"
@@ -462,24 +541,30 @@ class SubtitleExtractor:
                     f"Start Frame No: {start_frame}, Stop Frame No: {stop_frame}")
         start = cv.getTickCount()
 
-        self.get_frames_and_texts(sub_area, start_frame, stop_frame)
-        self.load_extracted_texts()
-        self.process_extracted_texts()
-        subtitles = self.generate_subtitle()
-        save_path = self.save_subtitle(subtitles)
+        if self._set_results_store(sub_area, start_frame, stop_frame):
+            logger.info("Stored results found for the video, frame & text extraction skipped.")
+            save_path = self.generate_stored_subtitle()
+        elif utils.Config.stream_subtitles and not utils.Config.save_frames_to_disk:
+            self._start_subtitle_stream()
+            completed = self.get_frames_and_texts(sub_area, start_frame, stop_frame)
+            save_path = self._finish_subtitle_stream(completed)
+        else:
+            self.get_frames_and_texts(sub_area, start_frame, stop_frame)
+            self.results_store.load()
+            save_path = self.generate_stored_subtitle()
 
         end = cv.getTickCount()
         total_time = (end - start) / cv.getTickFrequency()
         total_time = timedelta(seconds=round(total_time))
+        logger.info(f"OCR cache hits: {self.cache_hits:,}, misses: {self.cache_misses:,}")
         logger.info(f"Subtitle Extraction Done! Total time: {total_time}\n")
-        self._empty_cache()
         return save_path
 
 
 if __name__ == '__main__':
     setup_logging()
     logger.debug("\n\nMain program Started.")
-    logger.info(utils.Config.device_msg)
+    logger.info(utils.Config.device_msg())
     test_se = SubtitleExtractor()
     test_vid = r""
     test_se.run_extraction(test_vid)
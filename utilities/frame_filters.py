@@ -0,0 +1,199 @@
+import logging
+from typing import Iterable, Iterator
+
+import cv2 as cv
+import numpy as np
+
+from utilities.text_lines import MIN_LINE_HEIGHT, ROW_EDGE_DENSITY, edge_map
+
+logger = logging.getLogger(__name__)
+
+# Difference in grayscale level needed for a pixel to count as changed. Absorbs compression noise.
+PIXEL_CHANGE_LEVEL = 30
+# Factor used to downscale frames before comparing them.
+SIGNATURE_SCALE = 0.25
+# Frames with fewer rows of text edges than this are blank. Half the height of the lowest readable line,
+# so thin or faint text is still sent to ocr.
+BLANK_MIN_TEXT_ROWS = MIN_LINE_HEIGHT // 2
+
+
+def frame_signature(image: np.ndarray) -> np.ndarray:
+    """
+    Create a small grayscale version of a frame that is cheap to compare with other frames.
+    """
+    gray = cv.cvtColor(image, cv.COLOR_BGR2GRAY) if image.ndim == 3 else image
+    return cv.resize(gray, None, fx=SIGNATURE_SCALE, fy=SIGNATURE_SCALE, interpolation=cv.INTER_AREA)
+
+
+def frame_change(signature_1: np.ndarray, signature_2: np.ndarray) -> float:
+    """
+    Fraction of the pixels that changed between two frame signatures.
+    :return: Value between 0 (identical) and 1 (every pixel changed).
+    """
+    if signature_1.shape != signature_2.shape:
+        return 1.0
+    return np.count_nonzero(cv.absdiff(signature_1, signature_2) > PIXEL_CHANGE_LEVEL) / signature_1.size
+
+
+class ChangeGate:
+    def __init__(self, threshold: float) -> None:
+        """
+        Group consecutive frames that are unchanged so only the first frame of each group has to be sent to ocr.
+        Frames are compared to the first frame of the group and not to the previous frame,
+        so slow changes like fades can not drift past the threshold unnoticed.
+        :param threshold: Frames with a change below this value are added to the current group.
+        """
+        self.threshold = threshold
+        self.key_frame = self.key_signature = None
+        self.duplicates = []
+
+    def add(self, frame_position: float, image: np.ndarray) -> list:
+        """
+        Add the next frame to the gate.
+        :return: The previous group as (frame position, frame, duplicate frame positions) when a new group starts.
+        """
+        signature = frame_signature(image)
+        if self.key_frame and frame_change(self.key_signature, signature) < self.threshold:
+            self.duplicates.append(frame_position)
+            return []
+        groups = self.flush()
+        self.key_frame, self.key_signature = (frame_position, image), signature
+        return groups
+
+    def flush(self) -> list:
+        """
+        Return the current group and empty the gate.
+        """
+        if not self.key_frame:
+            return []
+        group = *self.key_frame, self.duplicates
+        self.key_frame = self.key_signature = None
+        self.duplicates = []
+        return [group]
+
+
+class BisectSampler:
+    def __init__(self, threshold: float, stride: int) -> None:
+        """
+        Coarse to fine grouping of consecutive frames that compares only a few of them.
+        The frames are read forward only. Every stride frame is compared to the first frame of the current group
+        and the frames in between are held until the next coarse sample. When the two differ, the held frames are
+        bisected to find the exact frame where the change happened. Only the compared frames get a signature.
+        The groups are returned in the same form as the ChangeGate.
+        :param threshold: Frames with a change below this value are added to the current group.
+        :param stride: Number of frames between the coarse samples.
+        """
+        self.threshold, self.stride = threshold, max(1, stride)
+        self.key_frame = self.key_signature = None
+        self.duplicates = []
+        self.signatures = 0  # Number of frame signatures made by the last call to groups.
+
+    def groups(self, frames: Iterable[tuple[float, np.ndarray]]) -> Iterator[tuple]:
+        """
+        Group the frames.
+        :param frames: The frame positions and frames in increasing order, see read_frames.
+        :return: The groups as (frame position, frame, duplicate frame positions).
+        """
+        self.signatures, window = 0, []  # The window holds the frames up to and including the next coarse sample.
+        for frame_position, image in frames:
+            if self.key_frame is None:
+                self.key_frame, self.key_signature = (frame_position, image), self._signature(image)
+                continue
+            # Crops are copied so the rest of the frame they were cut from can be freed while they are held.
+            window.append((frame_position, image if image.base is None else image.copy()))
+            if len(window) == self.stride:
+                yield from self._split(window)
+                window = []
+        if window:  # The last frame ends the last group exactly.
+            yield from self._split(window)
+        if self.key_frame is not None:
+            yield *self.key_frame, self.duplicates
+        self.key_frame = self.key_signature = None
+        self.duplicates = []
+
+    def _signature(self, image: np.ndarray) -> np.ndarray:
+        self.signatures += 1
+        return frame_signature(image)
+
+    def _split(self, window: list) -> Iterator[tuple]:
+        """
+        Bisect the frames of the window at each change from the current group and return the groups that end.
+        """
+        signatures = {}
+
+        def is_unchanged(index: int) -> bool:
+            if index not in signatures:
+                signatures[index] = self._signature(window[index][1])
+            return frame_change(self.key_signature, signatures[index]) < self.threshold
+
+        low, high = -1, len(window) - 1  # The frame at low is in the current group, -1 is the frame before the window.
+        while not is_unchanged(high):
+            last_unchanged, first_changed = low, high
+            while first_changed - last_unchanged > 1:
+                middle = (last_unchanged + first_changed) // 2
+                if is_unchanged(middle):
+                    last_unchanged = middle
+                else:
+                    first_changed = middle
+            self.duplicates.extend(frame_position for frame_position, _ in window[low + 1:first_changed])
+            yield *self.key_frame, self.duplicates
+            self.key_frame, self.key_signature = window[first_changed], signatures[first_changed]
+            self.duplicates, low = [], first_changed
+        self.duplicates.extend(frame_position for frame_position, _ in window[low + 1:])
+
+
+def is_blank(image: np.ndarray) -> bool:
+    """
+    Whether the subtitle area of a frame has too few text-like edges to contain text.
+    Black frames and smooth backgrounds are blank, textured backgrounds are not.
+    """
+    row_profile = edge_map(image).mean(axis=1)
+    return np.count_nonzero(row_profile > ROW_EDGE_DENSITY) < BLANK_MIN_TEXT_ROWS
+
+
+class BlankFilter:
+    def __init__(self, audit_interval: int) -> None:
+        """
+        Skip the ocr of frames that are blank.
+        Every audit interval blank frame is still sent to ocr, so frames with text that were taken for blank
+        can be counted. The ocr record of an audited frame is kept, so the audit never loses text.
+        :param audit_interval: Number of blank frames for each audited frame. 0 turns off the audit.
+        """
+        self.audit_interval = audit_interval
+        self.blank_frames = self.skipped = self.audited = self.audit_misses = 0
+
+    def select(self, images: list[np.ndarray]) -> tuple[list, list]:
+        """
+        Select the images that have to be sent to ocr.
+        :return: Indices of the images to ocr and indices of the blank images among them that are audited.
+        """
+        ocr_indices, audit_indices = [], []
+        for index, image in enumerate(images):
+            if not is_blank(image):
+                ocr_indices.append(index)
+                continue
+            self.blank_frames += 1
+            if self.audit_interval and self.blank_frames % self.audit_interval == 0:
+                ocr_indices.append(index)
+                audit_indices.append(index)
+            else:
+                self.skipped += 1
+        self.audited += len(audit_indices)
+        return ocr_indices, audit_indices
+
+    def audit(self, texts: list) -> None:
+        """
+        Count the audited frames that had text.
+        :param texts: Ocr texts of the audited frames.
+        """
+        if misses := [text for text in texts if text]:
+            self.audit_misses += len(misses)
+            logger.debug(f"Blank filter audit found text in blank frames: {misses}")
+
+    def take_stats(self) -> tuple:
+        """
+        Skipped, audited and audit miss counts since the last call.
+        """
+        stats = self.skipped, self.audited, self.audit_misses
+        self.skipped = self.audited = self.audit_misses = 0
+        return stats
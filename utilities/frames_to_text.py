@@ -1,81 +1,568 @@
+import atexit
 import logging
+import traceback
+from collections import defaultdict
 from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import cache
+from multiprocessing import Process, Queue
+from os import cpu_count
 from pathlib import Path
+from queue import Empty, Full
+from typing import TYPE_CHECKING, Callable
+
+import cv2 as cv
+import numpy as np
 
-import custom_paddleocr.paddleocr as cp
 import utilities.utils as utils
+from utilities.frame_filters import BlankFilter
+from utilities.ocr_cache import DISK_CACHE_FILE, OCRCache
+from utilities.results_store import ResultsStore
+from utilities.text_lines import find_text_lines
+from utilities.video_to_frames import decode_frames, get_frame_chunks
+
+if TYPE_CHECKING:
+    from custom_paddleocr.paddleocr import PaddleOCR
 
 logger = logging.getLogger(__name__)
 
-MODEL_PATH = Path(__file__).parent.parent / "models" / cp.DEFAULT_OCR_MODEL_VERSION / utils.Config.ocr_rec_language
-paddle_ocr = cp.PaddleOCR(
-    det_model_dir=f"{MODEL_PATH}/det",
-    rec_model_dir=f"{MODEL_PATH}/rec",
-    cls_model_dir=f"{MODEL_PATH}/cls",
-    use_angle_cls=True,
-    lang=utils.Config.ocr_rec_language,
-    show_log=False
-)
+# Ocr record of an image without text: text, score and boxes.
+EMPTY_RECORD = ("", 0.0, [])
+# Input widths of the text recognizer. Each batch of text lines is padded to the smallest width that fits it,
+# so the recognizer sees a few input shapes that stay compiled instead of a new shape for almost every batch.
+REC_WIDTH_BUCKETS = "320,480,640,800,960,1280,1600"
+
+
+def get_model_dir() -> Path:
+    """
+    Directory of the ocr models of the model version and recognition language.
+    """
+    return Path(__file__).parent.parent / "models" / utils.Config.ocr_model_version / utils.Config.ocr_rec_language
+
+
+@cache
+def get_paddle_ocr() -> "PaddleOCR":
+    """
+    Create the paddle ocr engine the first time it's used and return the same engine after that.
+    Paddle and the ocr models are only loaded by the processes that use them, so importing this module stays fast.
+    """
+    import custom_paddleocr.paddleocr as cp
+
+    model_path = get_model_dir()
+    return cp.PaddleOCR(
+        det_model_dir=f"{model_path}/det",
+        rec_model_dir=f"{model_path}/rec",
+        cls_model_dir=f"{model_path}/cls",
+        use_angle_cls=True,
+        lang=utils.Config.ocr_rec_language,
+        ocr_version=utils.Config.ocr_model_version,
+        use_temporal_det=utils.Config.use_temporal_det,
+        rec_batch_num=utils.Config.rec_batch_size,
+        rec_width_buckets=REC_WIDTH_BUCKETS,
+        rec_warmup=True,
+        show_log=False
+    )
+
+
+@cache
+def get_text_detector() -> "PaddleOCR":
+    """
+    Create an engine with only the text detection model the first time it's used and return the same engine
+    after that. Used by processes that only detect text boxes, they never load or warm up the recognizer.
+    """
+    import custom_paddleocr.paddleocr as cp
+
+    model_path = get_model_dir()
+    return cp.PaddleOCR(
+        det_model_dir=f"{model_path}/det",
+        rec_model_dir=f"{model_path}/rec",
+        cls_model_dir=f"{model_path}/cls",
+        lang=utils.Config.ocr_rec_language,
+        ocr_version=utils.Config.ocr_model_version,
+        det_only=True,
+        show_log=False
+    )
+
+
+@cache
+def get_ocr_cache() -> OCRCache | None:
+    """
+    Create the ocr cache of the process the first time it's used. None is returned if caching is turned off.
+    """
+    if utils.Config.ocr_cache_size < 1 and not utils.Config.use_ocr_disk_cache:
+        return None
+    namespace = f"{utils.Config.ocr_model_version}/{utils.Config.ocr_rec_language}"
+    disk_file = DISK_CACHE_FILE if utils.Config.use_ocr_disk_cache else None
+    return OCRCache(utils.Config.ocr_cache_size, namespace, disk_file)
+
+
+@cache
+def get_blank_filter() -> BlankFilter | None:
+    """
+    Create the blank filter of the process the first time it's used. None is returned if the filter is turned off.
+    """
+    return BlankFilter(utils.Config.blank_audit_interval) if utils.Config.use_blank_filter else None
+
+
+def extract_bboxes(images: list[np.ndarray], drop_score: float = 0.7) -> list[list]:
+    """
+    Returns the bounding boxes of the text detected in each image. Only the text detector runs,
+    the text is never recognized. The images are detected in batches.
+    :param images: Images with the same shape for detection.
+    :param drop_score: Boxes with a detection score below this score will not be returned.
+    The score is the mean text probability inside the box.
+    :return: A list of boxes for each image.
+    """
+    frame_boxes, batch_size = [], utils.Config.det_batch_size
+    for i in range(0, len(images), batch_size):
+        for result in get_text_detector().detect_batch(images[i:i + batch_size]):
+            frame_boxes.append([box for box, score in result or [] if score > drop_score])
+    return frame_boxes
+
+
+def make_record(lines: list) -> tuple:
+    """
+    Combine the lines of text found in an image into the ocr record of the image.
+    :param lines: The box, text and score of each line.
+    :return: The texts of the lines joined by spaces, the mean score of the lines and the boxes of the lines.
+    """
+    if not lines:
+        return EMPTY_RECORD
+    boxes, texts, scores = zip(*lines)
+    return " ".join(texts), round(float(np.mean(scores)), 4), list(boxes)
+
+
+def recognize_lines(images: list[np.ndarray], records: list[tuple]) -> list[int]:
+    """
+    Recognize the text lines found with projection profiles without running text detection.
+    :param images: The images as arrays.
+    :param records: List where the ocr record of each image is written.
+    :return: Indices of the images whose lines could not be found and still need text detection.
+    """
+    ocr = get_paddle_ocr()
+    detect, line_boxes, line_crops, line_owners = [], [], [], []
+    for index, image in enumerate(images):
+        lines = find_text_lines(image)
+        if lines is None:
+            detect.append(index)
+            continue
+        for box, crop in lines:
+            line_boxes.append(box)
+            line_crops.append(crop)
+            line_owners.append(index)
+    if line_crops:
+        # Subtitle lines are upright, so the angle classifier is skipped.
+        rec_res = ocr.ocr(line_crops, det=False, cls=False)[0]
+        image_lines = defaultdict(list)
+        for index, box, (text, score) in zip(line_owners, line_boxes, rec_res):
+            if score >= ocr.drop_score:
+                image_lines[index].append((box, text, score))
+        for index, lines in image_lines.items():
+            records[index] = make_record(lines)
+    logger.debug(f"Text lines found in {len(images) - len(detect)} of {len(images)} images.")
+    return detect
+
+
+def ocr_results(images: list[np.ndarray]) -> list[tuple]:
+    """
+    Use paddle ocr to get the texts in a batch of images. Images with the same shape are detected together
+    and the text lines of all the images are recognized together.
+    :param images: The images as arrays.
+    :return: The ocr record of each image in the same order as the images.
+    """
+    records = [EMPTY_RECORD] * len(images)
+    detect = recognize_lines(images, records) if utils.Config.use_line_finder else list(range(len(images)))
+    if detect:
+        results = get_paddle_ocr().ocr_batch([images[index] for index in detect])
+        for index, result in zip(detect, results):
+            records[index] = make_record([(box, text, score) for box, (text, score) in result or []])
+    return records
+
+
+def cached_ocr_results(images: list[np.ndarray]) -> list[tuple]:
+    """
+    Get the ocr records of a batch of images from the ocr cache. Only the images that are not in the cache are ocr'd.
+    :param images: The images as arrays.
+    :return: The ocr record of each image in the same order as the images.
+    """
+    if not (ocr_cache := get_ocr_cache()):
+        return ocr_results(images)
+    keys = [ocr_cache.key(image) for image in images]
+    records = [ocr_cache.get(key) for key in keys]
+    if misses := [index for index, record in enumerate(records) if record is None]:
+        new_records = ocr_results([images[index] for index in misses])
+        ocr_cache.put([keys[index] for index in misses], new_records)
+        for index, record in zip(misses, new_records):
+            records[index] = record
+    return records
+
+
+def filtered_ocr_results(images: list[np.ndarray]) -> list[tuple]:
+    """
+    Get the ocr records of a batch of images. Blank images are not sent to ocr, they get an empty record.
+    :param images: The images as arrays.
+    :return: The ocr record of each image in the same order as the images.
+    """
+    if not (blank_filter := get_blank_filter()):
+        return cached_ocr_results(images)
+    ocr_indices, audit_indices = blank_filter.select(images)
+    records = [EMPTY_RECORD] * len(images)
+    if ocr_indices:
+        for index, record in zip(ocr_indices, cached_ocr_results([images[index] for index in ocr_indices])):
+            records[index] = record
+    blank_filter.audit([records[index][0] for index in audit_indices])
+    return records
+
+
+def take_cache_stats() -> tuple:
+    """
+    Hit and miss counts of the ocr cache of the process since the last call.
+    """
+    ocr_cache = get_ocr_cache()
+    return ocr_cache.take_stats() if ocr_cache else (0, 0)
+
+
+def take_blank_stats() -> tuple:
+    """
+    Skipped, audited and audit miss counts of the blank filter of the process since the last call.
+    """
+    blank_filter = get_blank_filter()
+    return blank_filter.take_stats() if blank_filter else (0, 0, 0)
+
+
+def take_det_stats() -> tuple:
+    """
+    Number of images the text detector ran on and number of images that reused the boxes of an earlier image
+    with the same layout, since the last call. Boxes are only reused in temporal detection mode.
+    """
+    stats = get_paddle_ocr().temporal_stats
+    counts = stats["detected"], stats["reused"]
+    stats["detected"] = stats["reused"] = 0
+    return counts
+
+
+def take_rec_stats() -> dict:
+    """
+    Batch count and time of the text recognizer for each input width since the last call.
+    """
+    return get_paddle_ocr().text_recognizer.take_bucket_stats()
 
 
-def extract_bboxes(files: Path, drop_score: float = 0.9) -> list:
+def rec_stats_report(rec_stats: dict) -> str:
     """
-    Returns the bounding boxes of detected texted in images.
-    :param files: Directory with images for detection.
-    :param drop_score: Filter the results by score and those results below this score will not be returned.
+    Timing report of the text recognizer batches by input width.
     """
-    boxes = []
-    for file in files.iterdir():
-        result = paddle_ocr.ocr(str(file))
-        result = result[0]
-        if result:
-            score = result[0][1][1]
-            if score > drop_score:
-                box = result[0][0]
-                boxes.append(box)
-    return boxes
+    widths = [f"{width}px: {batches:,} batches, {seconds / batches * 1000:.1f}ms per batch"
+              for width, (batches, seconds) in sorted(rec_stats.items())]
+    return "Text recognition by input width: " + ("; ".join(widths) or "no batches")
 
 
-def extract_text(text_output: Path, files: list) -> None:
+def get_frame_batch(frame_queue: Queue, batch_size: int) -> tuple[list, bool]:
+    """
+    Wait for a frame from the queue, then take the frames that are already waiting up to the batch size.
+    :param frame_queue: Queue with frames. None signals that there are no more frames.
+    :param batch_size: Maximum number of frames in the batch.
+    :return: The frames and whether the end of the queue has been reached.
+    """
+    batch = []
+    item = frame_queue.get()
+    while item is not None:
+        batch.append(item)
+        if len(batch) == batch_size:
+            break
+        try:
+            item = frame_queue.get_nowait()
+        except Empty:
+            break
+    return batch, item is None
+
+
+def extract_text(files: list) -> tuple:
     """
     Extract text from a frame using paddle ocr.
-    :param text_output: directory for extracted texts.
+    The frames go through the blank filter and are batched like the frames of the pipeline, so both give the same texts.
     :param files: files with text for extraction.
+    :return: The ocr records of the frames by file name, the hit and miss counts of the ocr cache
+    and the skipped, audited and audit miss counts of the blank filter.
+    """
+    records, batch_size = {}, utils.Config.det_batch_size
+    for i in range(0, len(files), batch_size):
+        batch = files[i:i + batch_size]
+        for file, record in zip(batch, filtered_ocr_results([cv.imread(str(file)) for file in batch])):
+            records[file.stem] = record
+    return records, take_cache_stats(), take_blank_stats()
+
+
+def ocr_frames(frame_queue: Queue, event_queue: Queue) -> None:
+    """
+    Consumer stage of the text extraction pipeline.
+    Extract text from the frames in the frame queue as they arrive. None signals that there are no more frames.
+    Frames waiting in the queue are taken together, so the text detection of the batch runs in one call.
+    Unchanged frames that were skipped by the decoder get the same ocr record as the frame they were sent with.
+    :param frame_queue: Queue with the chunk index, frame position, frame and positions of unchanged frames.
+    :param event_queue: Queue used to send the ocr records of the frame positions that have been processed,
+    ocr cache stats, blank filter stats, text detection and recognition stats or errors.
+    """
+    try:
+        get_paddle_ocr()  # Load the models while the first frames are being decoded.
+        done = False
+        while not done:
+            batch, done = get_frame_batch(frame_queue, utils.Config.det_batch_size)
+            if not batch:
+                continue
+            records = filtered_ocr_results([image for _, _, image, _ in batch])
+            # Stats are sent before the texts, so they are counted before the end.
+            event_queue.put(("cache", take_cache_stats()))
+            event_queue.put(("blank", take_blank_stats()))
+            event_queue.put(("det", take_det_stats()))
+            event_queue.put(("rec", take_rec_stats()))
+            for (chunk_index, frame_position, _, duplicate_positions), record in zip(batch, records):
+                positions = (frame_position, *duplicate_positions)
+                event_queue.put(("ocr", (chunk_index, [(position, record) for position in positions])))
+    except Exception:
+        event_queue.put(("error", traceback.format_exc()))
+
+
+def _stop_processes(processes: list) -> None:
+    """
+    Terminate processes that are still running.
     """
-    for file in files:
-        name = Path(f"{text_output}/{file.stem}.txt")
-        if not name.exists():  # condition is used when rerunning after failed text extraction.
-            result = paddle_ocr.ocr(str(file))
-            text_list = [line[1][0] for line in result[0]] if result[0] else ""
-            text = " ".join(text_list)
-            with open(name, 'w', encoding="utf-8") as text_file:
-                text_file.write(text)
+    for process in processes:
+        if process.is_alive():
+            process.terminate()
+        process.join()
 
 
-def frames_to_text(frame_output: Path, text_output: Path) -> None:
+class OCRWorkerPool:
+    def __init__(self, processes: int) -> None:
+        """
+        Long-lived ocr processes that take frames from a shared queue.
+        The ocr models are loaded once when the processes start and stay loaded for every video in a batch.
+        :param processes: Number of ocr processes.
+        """
+        self.processes, self.queue_size = processes, utils.Config.frame_queue_size
+        self.settings = _get_pool_settings()
+        self.frame_queue, self.event_queue = Queue(self.queue_size), Queue()
+        self.workers = [Process(target=ocr_frames, args=(self.frame_queue, self.event_queue), daemon=True)
+                        for _ in range(processes)]
+        for worker in self.workers:
+            worker.start()
+        logger.debug(f"OCR worker pool started, {processes=}")
+
+    def is_alive(self) -> bool:
+        return all(worker.is_alive() for worker in self.workers)
+
+    def shutdown(self, timeout: float = 5) -> None:
+        """
+        Stop the ocr processes. Processes that don't stop within the timeout are terminated.
+        """
+        try:
+            for _ in self.workers:
+                self.frame_queue.put(None, timeout=timeout)
+        except Full:  # The queue still has frames from an unfinished video, the processes will be terminated.
+            pass
+        for worker in self.workers:
+            worker.join(timeout)
+        _stop_processes(self.workers)
+        logger.debug("OCR worker pool shut down.")
+
+
+_ocr_pool = None
+
+
+def get_ocr_pool() -> OCRWorkerPool:
+    """
+    Return the shared ocr worker pool. A new pool is started if there is none or the settings have changed.
+    The pool has a single frame and event queue, so it's used by one job at a time, see utils.Process.job_lock.
+    """
+    global _ocr_pool
+    if _ocr_pool and (not _ocr_pool.is_alive() or _ocr_pool.settings != _get_pool_settings()):
+        shutdown_ocr_pool()
+    if not _ocr_pool:
+        _ocr_pool = OCRWorkerPool(get_max_processes())
+    return _ocr_pool
+
+
+def shutdown_ocr_pool() -> None:
+    """
+    Stop the shared ocr worker pool if it's running.
+    """
+    global _ocr_pool
+    if _ocr_pool:
+        _ocr_pool.shutdown()
+        _ocr_pool = None
+
+
+atexit.register(shutdown_ocr_pool)
+
+
+def _get_pool_settings() -> tuple:
+    """
+    Settings used by the ocr worker processes. The processes only see the settings they were started with.
+    """
+    return (get_max_processes(), utils.Config.frame_queue_size, utils.Config.ocr_rec_language,
+            utils.Config.det_batch_size, utils.Config.use_line_finder, utils.Config.ocr_cache_size,
+            utils.Config.use_ocr_disk_cache, utils.Config.use_blank_filter, utils.Config.blank_audit_interval,
+            utils.Config.use_temporal_det, utils.Config.rec_batch_size)
+
+
+def get_max_processes() -> int:
+    """
+    Number of processes used for text extraction, at least one.
+    """
+    if utils.Config.use_gpu():
+        return max(1, utils.Config.ocr_gpu_max_processes)
+    return max(1, utils.Config.ocr_cpu_max_processes)
+
+
+def frames_to_text(frame_output: Path, store: ResultsStore) -> tuple:
     """
     Extracts the texts from frames using multiprocessing
     :param frame_output: directory of the frames
-    :param text_output: directory for extracted texts
+    :param store: Results store the ocr records of the frames are added to.
+    :return: Hit and miss counts of the ocr cache.
     """
     chunk_size = utils.Config.text_extraction_chunk_size  # Size of files given to each processor.
-    if utils.Config.use_gpu:
-        max_processes = utils.Config.ocr_gpu_max_processes
-    else:
-        max_processes = utils.Config.ocr_cpu_max_processes
+    max_processes = get_max_processes()
     prefix = "Text Extraction"
     if utils.Process.interrupt_process:  # Cancel if process has been cancelled by gui.
         logger.warning(f"{prefix} process interrupted!")
-        return
+        return 0, 0
 
     logger.info(f"Starting {prefix} from frames...")
     files = list(frame_output.iterdir())
     file_chunks = [files[i:i + chunk_size] for i in range(0, len(files), chunk_size)]
     no_chunks = len(file_chunks)
     logger.debug(f"Using multiprocessing for {prefix}, {max_processes=}, {no_chunks=}")
+    cache_hits = cache_misses = 0
+    blank_stats = [0, 0, 0]
     with ProcessPoolExecutor(max_processes) as executor:
-        futures = [executor.submit(extract_text, text_output, files) for files in file_chunks]
+        futures = [executor.submit(extract_text, files) for files in file_chunks]
         for i, f in enumerate(as_completed(futures)):  # as each  process completes
-            f.result()  # Prevents silent bugs. Exceptions raised will be displayed.
+            # Prevents silent bugs. Exceptions raised will be displayed.
+            records, (hits, misses), chunk_blank_stats = f.result()
+            for name, record in records.items():
+                store.add(float(name), record)
+            cache_hits, cache_misses = cache_hits + hits, cache_misses + misses
+            blank_stats = [total + count for total, count in zip(blank_stats, chunk_blank_stats)]
             utils.print_progress(i, no_chunks - 1, prefix)
     logger.info(f"{prefix} done!")
+    if utils.Config.use_blank_filter:
+        skipped, audited, audit_misses = blank_stats
+        logger.info(f"Blank filter: {skipped:,} frames skipped, "
+                    f"{audit_misses:,} of {audited:,} audited blank frames had text.")
+    return cache_hits, cache_misses
+
+
+def video_to_text(video_path: str, store: ResultsStore, key_area: tuple | None, start_frame: int = None,
+                  stop_frame: int = None, on_record: Callable[[float, tuple], None] = None) -> tuple:
+    """
+    Extracts the texts from a video with a producer/consumer pipeline.
+    Decoder processes put frames into a bounded queue while the ocr worker pool takes the frames out as they arrive,
+    so decoding and text extraction run at the same time. The frames are kept in memory and never written to disk.
+    The ocr records are released in frame position order. The records of a chunk are held until the chunk and
+    all the chunks before it are complete.
+    :param video_path: path like string to the video
+    :param store: Results store the ocr records of the frames are added to.
+    :param key_area: coordinates of the frame containing subtitle
+    :param start_frame: The frame where text extractions from video starts.
+    :param stop_frame: The frame where text extractions from video stops.
+    :param on_record: Called with the frame position and ocr record of each frame, in frame position order.
+    :return: Hit and miss counts of the ocr cache.
+    """
+    every = utils.Config.frame_extraction_frequency
+    decoder_processes = max(1, cpu_count() - get_max_processes())
+    prefix = "Text Extraction"
+    if utils.Process.interrupt_process:  # Cancel if process has been cancelled by gui.
+        logger.warning(f"{prefix} process interrupted!")
+        return 0, 0
+
+    logger.info(f"Starting {prefix} from video...")
+    frame_chunks = get_frame_chunks(video_path, start_frame, stop_frame, decoder_processes)
+    if not frame_chunks:
+        return 0, 0
+    no_chunks = len(frame_chunks)
+    decoder_processes = min(decoder_processes, no_chunks)
+    pool = get_ocr_pool()
+    logger.debug(f"Using pipeline for {prefix}, {decoder_processes=}, ocr_processes={pool.processes}, {no_chunks=}")
+
+    chunk_queue = Queue()
+    for chunk_index, chunk in enumerate(frame_chunks):
+        chunk_queue.put((chunk_index, *chunk))
+    for _ in range(decoder_processes):
+        chunk_queue.put(None)
+    decoders = [Process(target=decode_frames,
+                        args=(video_path, key_area, every, chunk_queue, pool.frame_queue, pool.event_queue))
+                for _ in range(decoder_processes)]
+    for process in decoders:
+        process.start()
+
+    # A chunk is complete when it has been decoded and all the frame positions sent from it have been processed.
+    chunk_frames, processed_chunk_frames, chunk_records = {}, defaultdict(int), defaultdict(list)
+    completed_chunk_indices = set()
+    completed_chunks = processed_frames = frames_sent = cache_hits = cache_misses = next_chunk = 0
+    blank_stats = [0, 0, 0]  # Skipped, audited and audit miss counts of the blank filter.
+    det_stats = [0, 0]  # Detected and reused box counts of the text detector.
+    rec_stats = {}  # Batch count and time of the text recognizer by input width.
+    try:
+        while completed_chunks < no_chunks:
+            if utils.Process.interrupt_process:
+                logger.warning(f"{prefix} process interrupted!")
+                return cache_hits, cache_misses
+            try:
+                event, value = pool.event_queue.get(timeout=0.5)
+            except Empty:
+                if not pool.is_alive():
+                    raise RuntimeError(f"{prefix} processes stopped unexpectedly!")
+                continue
+            if event == "error":
+                raise RuntimeError(f"{prefix} process failed!\n{value}")
+            if event == "cache":
+                cache_hits, cache_misses = cache_hits + value[0], cache_misses + value[1]
+                continue
+            if event == "blank":
+                blank_stats = [total + count for total, count in zip(blank_stats, value)]
+                continue
+            if event == "det":
+                det_stats = [total + count for total, count in zip(det_stats, value)]
+                continue
+            if event == "rec":
+                for width, (batches, seconds) in value.items():
+                    total_batches, total_seconds = rec_stats.get(width, (0, 0.0))
+                    rec_stats[width] = total_batches + batches, total_seconds + seconds
+                continue
+            chunk_index, frames = value
+            if event == "decoded":
+                chunk_frames[chunk_index] = frames
+            else:
+                chunk_records[chunk_index].extend(frames)
+                frames_sent += 1
+                processed_frames += len(frames)
+                processed_chunk_frames[chunk_index] += len(frames)
+            if chunk_frames.get(chunk_index) == processed_chunk_frames[chunk_index]:
+                del chunk_frames[chunk_index]
+                utils.print_progress(completed_chunks, no_chunks - 1, prefix)
+                completed_chunks += 1
+                completed_chunk_indices.add(chunk_index)
+                while next_chunk in completed_chunk_indices:  # Release the completed chunks in order.
+                    completed_chunk_indices.remove(next_chunk)
+                    for position, record in sorted(chunk_records.pop(next_chunk, []), key=lambda frame: frame[0]):
+                        store.add(position, record)
+                        if on_record:
+                            on_record(position, record)
+                    next_chunk += 1
+        for process in decoders:
+            process.join()
+    finally:
+        _stop_processes(decoders)
+        if completed_chunks < no_chunks:  # Frames of the unfinished video could still be in the pool queues.
+            shutdown_ocr_pool()
+    logger.info(f"{prefix} done! {frames_sent:,} of {processed_frames:,} frames changed "
+                f"and were sent to the OCR workers.")
+    if utils.Config.use_blank_filter:
+        skipped, audited, audit_misses = blank_stats
+        logger.info(f"Blank filter: {skipped:,} frames skipped, "
+                    f"{audit_misses:,} of {audited:,} audited blank frames had text.")
+    if utils.Config.use_temporal_det:
+        logger.info(f"Temporal detection: {det_stats[0]:,} frames detected, {det_stats[1]:,} frames reused boxes.")
+    logger.info(rec_stats_report(rec_stats))
+    return cache_hits, cache_misses
@@ -0,0 +1,106 @@
+import hashlib
+import json
+import logging
+import sqlite3
+from collections import OrderedDict
+from pathlib import Path
+
+import cv2 as cv
+import numpy as np
+
+import utilities.utils as utils
+
+logger = logging.getLogger(__name__)
+
+# Width and height the crops are shrunk to before they are binarized. The grid is fine enough
+# that subtitles differing by one character, or by a comma, get different keys.
+KEY_WIDTH, KEY_HEIGHT = 384, 32
+# Crops with less difference than this between their darkest and brightest pixel can't be binarized,
+# Otsu's threshold would only split their noise. They are keyed by their exact pixels instead.
+MIN_CONTRAST = 64
+# Location of the on-disk tier, shared by every video and program run.
+DISK_CACHE_FILE = utils.Config.cache_dir / "ocr_cache.sqlite3"
+
+
+def crop_hash(image: np.ndarray) -> str:
+    """
+    Digest of the binarized sub area crop. The crop is shrunk with area averaging, which smooths out
+    compression noise, and the text is separated from the background with Otsu's threshold.
+    Unlike a perceptual hash, the key changes when any character of the subtitle changes.
+    Crops with too little contrast get a digest of their exact pixels, so they only share a key with identical crops.
+    :return: The digest as a hex string.
+    """
+    gray = cv.cvtColor(image, cv.COLOR_BGR2GRAY) if image.ndim == 3 else image
+    small = cv.resize(gray, (KEY_WIDTH, KEY_HEIGHT), interpolation=cv.INTER_AREA)
+    if int(small.max()) - int(small.min()) < MIN_CONTRAST:
+        pixels = repr(image.shape).encode() + image.tobytes()
+        return hashlib.blake2b(pixels, digest_size=16, person=b"raw").hexdigest()
+    _, binary = cv.threshold(small, 0, 1, cv.THRESH_BINARY + cv.THRESH_OTSU)
+    return hashlib.blake2b(np.packbits(binary).tobytes(), digest_size=16).hexdigest()
+
+
+class OCRCache:
+    def __init__(self, size: int, namespace: str, disk_file: Path = None) -> None:
+        """
+        Cache of ocr records keyed by the digest of the binarized image they were extracted from.
+        Recently used records are kept in memory, all records are also kept on disk if a disk file is given.
+        :param size: Maximum number of records kept in memory.
+        :param namespace: Prefix of the keys, records from other models or languages are never returned.
+        :param disk_file: Sqlite file of the on-disk tier.
+        """
+        self.size, self.namespace = size, namespace
+        self.memory = OrderedDict()
+        self.hits = self.misses = 0
+        self.connection = None
+        if disk_file:
+            disk_file.parent.mkdir(parents=True, exist_ok=True)
+            self.connection = sqlite3.connect(disk_file, timeout=30)
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute("CREATE TABLE IF NOT EXISTS ocr_results "
+                                    "(key TEXT PRIMARY KEY, record TEXT NOT NULL)")
+
+    def key(self, image: np.ndarray) -> str:
+        return f"{self.namespace}/{crop_hash(image)}"
+
+    def get(self, key: str) -> tuple | None:
+        """
+        Return the cached ocr record of the key or None if the key is not in the cache.
+        """
+        if key in self.memory:
+            self.memory.move_to_end(key)
+            self.hits += 1
+            return self.memory[key]
+        if self.connection:
+            row = self.connection.execute("SELECT record FROM ocr_results WHERE key = ?", (key,)).fetchone()
+            if row:
+                record = tuple(json.loads(row[0]))
+                self._remember(key, record)
+                self.hits += 1
+                return record
+        self.misses += 1
+
+    def put(self, keys: list, records: list) -> None:
+        """
+        Add the ocr records of the keys to the cache.
+        """
+        for key, record in zip(keys, records):
+            self._remember(key, record)
+        if self.connection:
+            rows = [(key, json.dumps(record, ensure_ascii=False)) for key, record in zip(keys, records)]
+            with self.connection:
+                self.connection.executemany("INSERT OR REPLACE INTO ocr_results VALUES (?, ?)", rows)
+
+    def _remember(self, key: str, record: tuple) -> None:
+        if self.size < 1:
+            return
+        self.memory[key] = record
+        self.memory.move_to_end(key)
+        if len(self.memory) > self.size:
+            self.memory.popitem(last=False)
+
+    def take_stats(self) -> tuple:
+        """
+        Return the hit and miss counts since the last call.
+        """
+        stats, self.hits, self.misses = (self.hits, self.misses), 0, 0
+        return stats
@@ -0,0 +1,118 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from pathlib import Path
+
+import utilities.utils as utils
+
+logger = logging.getLogger(__name__)
+
+# Directory of the stored results, shared by every program run.
+RESULTS_DIR = utils.Config.cache_dir / "results"
+# Size of the blocks read from the start, middle and end of a video to hash its content.
+HASH_BLOCK_SIZE = 1024 * 1024
+
+
+def video_hash(video_path: str) -> str:
+    """
+    Hash of the content of a video. Only blocks from the start, middle and end of the file are read,
+    so large videos are hashed quickly. The file size is part of the hash.
+    """
+    size = os.path.getsize(video_path)
+    digest = hashlib.blake2b(str(size).encode(), digest_size=16)
+    with open(video_path, "rb") as video:
+        for offset in (0, max(0, size // 2 - HASH_BLOCK_SIZE // 2), max(0, size - HASH_BLOCK_SIZE)):
+            video.seek(offset)
+            digest.update(video.read(HASH_BLOCK_SIZE))
+    return digest.hexdigest()
+
+
+def results_key(video_path: str, sub_area: tuple, start_frame: int | None, stop_frame: int | None,
+                model_version: str, language: str) -> str:
+    """
+    Key of the ocr results of a video. It changes when the video content, the extracted frames or the ocr model change.
+    :param model_version: Version of the ocr models.
+    :param language: Recognition language of the ocr models.
+    """
+    settings = (video_hash(video_path), tuple(map(int, sub_area)), start_frame, stop_frame,
+                utils.Config.frame_extraction_frequency, utils.Config.frame_change_threshold,
+                utils.Config.use_bisect_sampling, utils.Config.coarse_sampling_stride, utils.Config.use_line_finder,
+                utils.Config.use_blank_filter, utils.Config.use_temporal_det, model_version, language)
+    return hashlib.blake2b(repr(settings).encode(), digest_size=16).hexdigest()
+
+
+class ResultsStore:
+    def __init__(self, key: str) -> None:
+        """
+        Durable store of the ocr records of the frames of a video, kept in a single append-only JSON lines file.
+        Subtitles can be generated again from the stored records without extracting the frames and texts again.
+        Added records are only written to the file, the records are held in memory after they are loaded.
+        :param key: Key of the results, see results_key.
+        """
+        self.file = RESULTS_DIR / f"{key}.jsonl"
+        self.partial_file = None  # Results file of a run that hasn't completed yet, unique to the run.
+        self.records = {}
+        self.no_of_added_records = 0
+        self.writer = None
+
+    def add(self, frame_position: float, record: tuple) -> None:
+        """
+        Add the ocr record (text, score, boxes) of a frame position.
+        The record is appended to the results file of the run as a single line.
+        """
+        if not self.writer:
+            self._open_writer()
+        self.writer.write(json.dumps([frame_position, *record], ensure_ascii=False) + "\n")
+        self.no_of_added_records += 1
+
+    def _open_writer(self) -> None:
+        self.file.parent.mkdir(parents=True, exist_ok=True)
+        # Runs of the same video at the same time each write their own partial file.
+        self.writer = tempfile.NamedTemporaryFile('w', encoding="utf-8", dir=self.file.parent,
+                                                  prefix=f"{self.file.stem}.", suffix=".part", delete=False)
+        self.partial_file = Path(self.writer.name)
+
+    def save(self) -> None:
+        """
+        Complete the results file of the run. It replaces the stored results in one step,
+        so the stored results are never left half written.
+        """
+        if not self.writer:  # A video without frames still gets a results file.
+            self._open_writer()
+        self.writer.close()
+        self.writer = None
+        os.replace(self.partial_file, self.file)
+        logger.debug(f"{self.no_of_added_records:,} ocr records stored. Path: {self.file}")
+
+    def discard(self) -> None:
+        """
+        Delete the results file of a run that didn't complete.
+        """
+        if self.writer:
+            self.writer.close()
+            self.writer = None
+        if self.partial_file:
+            self.partial_file.unlink(missing_ok=True)
+
+    def load(self) -> bool:
+        """
+        Read the records from the results file in one sequential read.
+        :return: Whether stored records were found.
+        """
+        if not self.file.exists():
+            return False
+        with open(self.file, encoding="utf-8") as results_file:
+            rows = map(json.loads, results_file)
+            self.records = {position: (text, score, boxes) for position, text, score, boxes in rows}
+        logger.debug(f"{len(self.records):,} ocr records loaded. Path: {self.file}")
+        return True
+
+    def texts(self) -> tuple[list, list]:
+        """
+        Texts of the frame positions that have text, in the order of the frame positions.
+        :return: The frame positions and their texts.
+        """
+        rows = [(position, record[0]) for position, record in sorted(self.records.items()) if record[0]]
+        return [position for position, _ in rows], [text for _, text in rows]
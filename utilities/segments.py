@@ -0,0 +1,269 @@
+import abc
+from typing import Callable, Iterator
+
+import numpy as np
+
+
+class Segments:
+    __slots__ = ("starts", "ends", "texts")
+
+    def __init__(self, starts: list | np.ndarray = (), ends: list | np.ndarray = (), texts: list = ()) -> None:
+        """
+        Subtitle segments held as arrays of start and end times with a parallel list of texts.
+        :param starts: Start time of each segment in milliseconds.
+        :param ends: End time of each segment in milliseconds.
+        :param texts: Text of each segment.
+        """
+        self.starts = np.asarray(starts, dtype=np.float64)
+        self.ends = np.asarray(ends, dtype=np.float64)
+        self.texts = list(texts)
+
+    @classmethod
+    def from_frames(cls, frame_positions: list, texts: list) -> "Segments":
+        """
+        Create a segment for each frame. The segments start and end at the frame position.
+        """
+        return cls(frame_positions, frame_positions, texts)
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def __iter__(self) -> Iterator[tuple]:
+        """
+        Iterate over the start time, end time and text of each segment.
+        """
+        return zip(self.starts.tolist(), self.ends.tolist(), self.texts)
+
+    @property
+    def durations(self) -> np.ndarray:
+        return self.ends - self.starts
+
+    def take(self, indices: np.ndarray) -> "Segments":
+        """
+        Return the segments at the indices or where the indices are True.
+        """
+        indices = np.flatnonzero(indices) if indices.dtype == bool else indices
+        return Segments(self.starts[indices], self.ends[indices], [self.texts[index] for index in indices.tolist()])
+
+
+def merge_adjacent_equal_texts(segments: Segments) -> Segments:
+    """
+    Merge segments that are beside each other and have the exact same text.
+    The last segment is always kept as a segment of its own.
+    """
+    if len(segments) < 2:
+        return Segments()
+    texts, last = np.array(segments.texts, dtype=object), len(segments) - 1
+    # Runs end where the next text is different, the segment before the last one always ends a run.
+    run_ends = np.r_[np.flatnonzero(texts[:-2] != texts[1:-1]), last - 1]
+    run_starts = np.r_[0, run_ends[:-1] + 1]
+    return Segments(np.r_[segments.starts[run_starts], segments.starts[last]],
+                    np.r_[segments.ends[run_ends], segments.ends[last]],
+                    texts[np.r_[run_ends, last]].tolist())
+
+
+def merge_adjacent_similar_texts(segments: Segments, threshold: float,
+                                 similarity: Callable[[str, str, float], float]) -> Segments:
+    """
+    Merge segments that don't have the same text but are beside each other and similar.
+    The text with the longest duration becomes the text for all similar segments.
+    The last segment is always merged into the segment before it.
+    :param segments: Segments to merge.
+    :param threshold: Cut off point to determine similarity.
+    :param similarity: Function that returns the similarity of two texts between 0 and 1.
+    It's given the threshold as a cutoff, below which it may stop early and return 0.
+    """
+    if len(segments) < 2:
+        return Segments()
+    texts, durations, last_pair = segments.texts, segments.durations.tolist(), len(segments) - 2
+    run_starts, run_ends, run_texts = [], [], []
+    run_start = run_text = run_duration = None
+    for index in range(len(segments) - 1):
+        if index != last_pair and similarity(texts[index], texts[index + 1], threshold) >= threshold:
+            if run_start is None:
+                run_start, run_text, run_duration = index, texts[index], durations[index]
+            if durations[index + 1] > run_duration:  # Change text and duration when longer duration is found.
+                run_text, run_duration = texts[index + 1], durations[index + 1]
+        else:
+            if run_start is None:  # The segment doesn't match the previous or next segment.
+                run_start, run_text = index, texts[index]
+            run_starts.append(run_start)
+            run_ends.append(index + 1 if index == last_pair else index)
+            run_texts.append(run_text)
+            run_start = run_text = run_duration = None
+    return Segments(segments.starts[run_starts], segments.ends[run_ends], run_texts)
+
+
+def remove_short_duration_consecutive_subs(segments: Segments, min_duration: float,
+                                           max_short_durations: int) -> Segments:
+    """
+    Remove runs of consecutive segments that are all shorter than the minimum duration,
+    when the run has at least the maximum allowed number of short durations. The last segment is never removed.
+    :param segments: Segments to filter.
+    :param min_duration: Minimum allowed consecutive duration in milliseconds.
+    :param max_short_durations: Maximum allowed number of short durations in a row.
+    """
+    if len(segments) < 2:
+        return segments
+    short = np.r_[False, segments.durations[:-1] < min_duration, False].astype(np.int8)
+    edges = np.diff(short)
+    run_starts, run_ends = np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+    removed = run_ends - run_starts >= max(2, max_short_durations)  # A single short duration is not a run.
+    # Mark the removed runs with +1 at their start and -1 after their end, the running sum is 0 outside of them.
+    marks = np.zeros(len(segments) + 1, dtype=np.int64)
+    np.add.at(marks, run_starts[removed], 1)
+    np.add.at(marks, run_ends[removed], -1)
+    return segments.take(np.cumsum(marks[:-1]) == 0)
+
+
+def remove_short_duration_subs(segments: Segments, min_duration: float) -> Segments:
+    """
+    Remove segments with a duration that is not longer than the minimum duration in milliseconds.
+    """
+    return segments.take(segments.durations > min_duration)
+
+
+class _StreamPass(abc.ABC):
+    def __init__(self) -> None:
+        """
+        Pass over segments that arrive one at a time in time order. Each segment is held back until the next one
+        arrives, so the pass knows when it's given the last segment, which the batch passes treat differently.
+        """
+        self.pending = None
+
+    def push(self, segment: tuple) -> list:
+        """
+        Give the pass the next (start, end, text) segment.
+        :return: The segments that are finished.
+        """
+        finished = self.process(self.pending, False) if self.pending else []
+        self.pending = segment
+        return finished
+
+    def finish(self) -> list:
+        """
+        Tell the pass that there are no more segments.
+        :return: The remaining segments.
+        """
+        finished = self.process(self.pending, True) if self.pending else []
+        self.pending = None
+        return finished
+
+    @abc.abstractmethod
+    def process(self, segment: tuple, is_last: bool) -> list:
+        """
+        Process a segment that is known to be or not be the last one.
+        :return: The segments that are finished.
+        """
+
+
+class _StreamEqualMerge(_StreamPass):
+    def __init__(self) -> None:
+        """
+        Streaming version of merge_adjacent_equal_texts.
+        """
+        super().__init__()
+        self.run, self.count = None, 0
+
+    def process(self, segment: tuple, is_last: bool) -> list:
+        self.count += 1
+        if is_last:
+            finished = [self.run, segment] if self.run else [] if self.count < 2 else [segment]
+            self.run = None
+            return finished
+        if self.run and self.run[2] == segment[2]:
+            self.run = self.run[0], segment[1], self.run[2]
+            return []
+        finished = [self.run] if self.run else []
+        self.run = segment
+        return finished
+
+
+class _StreamSimilarMerge(_StreamPass):
+    def __init__(self, threshold: float, similarity: Callable[[str, str, float], float]) -> None:
+        """
+        Streaming version of merge_adjacent_similar_texts.
+        """
+        super().__init__()
+        self.threshold, self.similarity = threshold, similarity
+        self.previous = self.run_start = self.run_text = self.run_duration = None
+
+    def process(self, segment: tuple, is_last: bool) -> list:
+        previous, self.previous = self.previous, segment
+        if previous is None:  # Segments are compared to the segment before them.
+            return []
+        if not is_last and self.similarity(previous[2], segment[2], self.threshold) >= self.threshold:
+            if self.run_start is None:
+                self.run_start, self.run_text, self.run_duration = previous[0], previous[2], previous[1] - previous[0]
+            if segment[1] - segment[0] > self.run_duration:  # Change text and duration when longer duration is found.
+                self.run_text, self.run_duration = segment[2], segment[1] - segment[0]
+            return []
+        if self.run_start is None:  # The segment doesn't match the previous or next segment.
+            self.run_start, self.run_text = previous[0], previous[2]
+        finished = [(self.run_start, segment[1] if is_last else previous[1], self.run_text)]
+        self.run_start = self.run_text = self.run_duration = None
+        return finished
+
+
+class _StreamShortConsecutiveRemoval(_StreamPass):
+    def __init__(self, min_duration: float, max_short_durations: int) -> None:
+        """
+        Streaming version of remove_short_duration_consecutive_subs.
+        Short segments are held until the run they are in ends. Once the run is long enough to be removed,
+        the segments in it are dropped as they arrive, so a run never holds more than the maximum.
+        """
+        super().__init__()
+        self.min_duration, self.max_short_durations = min_duration, max(2, max_short_durations)
+        self.short_run, self.removing = [], False
+
+    def process(self, segment: tuple, is_last: bool) -> list:
+        if not is_last and segment[1] - segment[0] < self.min_duration:
+            if not self.removing:
+                self.short_run.append(segment)
+                if len(self.short_run) >= self.max_short_durations:
+                    self.short_run, self.removing = [], True
+            return []
+        finished = [*self.short_run, segment]
+        self.short_run, self.removing = [], False
+        return finished
+
+
+class SegmentStream:
+    def __init__(self, threshold: float, similarity: Callable[[str, str, float], float],
+                 min_consecutive_duration: float, max_short_durations: int, min_duration: float) -> None:
+        """
+        Run the subtitle passes on frame texts that arrive one at a time in time order. The segments are finished
+        as soon as no later frame can change them, so they can be written out while the frames are still being read.
+        Gives the same segments as running merge_adjacent_equal_texts, merge_adjacent_similar_texts,
+        remove_short_duration_consecutive_subs and remove_short_duration_subs on all the frames,
+        while only holding the few segments that are not finished.
+        :param threshold: Cut off point to determine similarity.
+        :param similarity: Function that returns the similarity of two texts between 0 and 1.
+        :param min_consecutive_duration: Minimum allowed consecutive duration in milliseconds.
+        :param max_short_durations: Maximum allowed number of short durations in a row.
+        :param min_duration: Minimum allowed duration in milliseconds.
+        """
+        self.passes = [_StreamEqualMerge(), _StreamSimilarMerge(threshold, similarity),
+                       _StreamShortConsecutiveRemoval(min_consecutive_duration, max_short_durations)]
+        self.min_duration = min_duration
+
+    def _run_passes(self, segments: list, finish: bool) -> list:
+        for stream_pass in self.passes:
+            segments = [finished for segment in segments for finished in stream_pass.push(segment)]
+            if finish:
+                segments.extend(stream_pass.finish())
+        return [segment for segment in segments if segment[1] - segment[0] > self.min_duration]
+
+    def add(self, frame_position: float, text: str) -> list:
+        """
+        Add the text of the next frame. The frame is a segment that starts and ends at the frame position.
+        :return: The (start, end, text) segments that are finished.
+        """
+        return self._run_passes([(frame_position, frame_position, text)], False)
+
+    def finish(self) -> list:
+        """
+        End the stream after the last frame.
+        :return: The remaining segments.
+        """
+        return self._run_passes([], True)
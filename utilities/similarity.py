@@ -0,0 +1,97 @@
+"""
+Normalized Levenshtein similarity of subtitle texts.
+The bit-parallel algorithm of Myers (in Hyyrö's formulation) is used for subtitle length texts,
+a row by row NumPy version is used for long texts and rapidfuzz is used instead when it's installed.
+All of them stop early once the similarity can no longer reach the cutoff.
+"""
+import numpy as np
+
+try:
+    from rapidfuzz.distance import Levenshtein as rapidfuzz_levenshtein
+except ImportError:
+    rapidfuzz_levenshtein = None
+
+# Texts longer than this are compared with the NumPy version, the bit vectors of longer texts get slow.
+BIT_PARALLEL_MAX_LENGTH = 512
+
+
+def bit_parallel_distance(text1: str, text2: str, max_distance: int) -> int:
+    """
+    Levenshtein distance computed one column at a time with the rows of the column held as bits of an integer.
+    :return: The distance or max_distance + 1 if the distance is larger than max_distance.
+    """
+    if not text1:
+        return min(len(text2), max_distance + 1)
+    pattern_masks = {}
+    for index, char in enumerate(text1):
+        pattern_masks[char] = pattern_masks.get(char, 0) | 1 << index
+    mask, last_row = (1 << len(text1)) - 1, 1 << len(text1) - 1
+    positive_vertical, negative_vertical, distance = mask, 0, len(text1)
+    remaining = len(text2)
+    for char in text2:
+        remaining -= 1
+        match = pattern_masks.get(char, 0)
+        vertical = match | negative_vertical
+        horizontal = ((((match & positive_vertical) + positive_vertical) & mask) ^ positive_vertical) | match
+        positive_horizontal = (negative_vertical | ~(horizontal | positive_vertical)) & mask
+        negative_horizontal = positive_vertical & horizontal
+        if positive_horizontal & last_row:
+            distance += 1
+        elif negative_horizontal & last_row:
+            distance -= 1
+        if distance - remaining > max_distance:  # Each remaining character can lower the distance by 1 at most.
+            return max_distance + 1
+        positive_horizontal = (positive_horizontal << 1 | 1) & mask
+        negative_horizontal = (negative_horizontal << 1) & mask
+        positive_vertical = (negative_horizontal | ~(vertical | positive_horizontal)) & mask
+        negative_vertical = positive_horizontal & vertical
+    return min(distance, max_distance + 1)  # An empty text2 never enters the loop.
+
+
+def numpy_distance(text1: str, text2: str, max_distance: int) -> int:
+    """
+    Levenshtein distance computed one row at a time with NumPy.
+    The insertions along a row are resolved with a running minimum, so every row is a few vector operations.
+    :return: The distance or max_distance + 1 if the distance is larger than max_distance.
+    """
+    codes1, codes2 = np.array([ord(char) for char in text1]), np.array([ord(char) for char in text2])
+    columns = np.arange(len(text2) + 1)
+    row = columns.copy()
+    for row_no, code in enumerate(codes1, start=1):
+        substitution = row[:-1] + (codes2 != code)
+        deletion = row[1:] + 1
+        new_row = np.empty_like(row)
+        new_row[0] = row_no
+        new_row[1:] = np.minimum(substitution, deletion)
+        row = np.minimum.accumulate(new_row - columns) + columns  # Insertions.
+        if row.min() > max_distance:  # The distance never goes down from one row to the next row's minimum.
+            return max_distance + 1
+    return min(int(row[-1]), max_distance + 1)
+
+
+def similarity(text1: str, text2: str, cutoff: float = 0.0) -> float:
+    """
+    Normalized Levenshtein similarity, 1 minus the edit distance divided by the length of the longer text.
+    Unlike comparing character counts, reordered text is not similar.
+    :param text1: First text.
+    :param text2: Second text.
+    :param cutoff: Similarities below the cutoff are returned as 0, which lets the comparison stop early.
+    :return: Value between 0 (different) and 1 (same).
+    """
+    if rapidfuzz_levenshtein:
+        return rapidfuzz_levenshtein.normalized_similarity(text1, text2, score_cutoff=cutoff)
+    longest = max(len(text1), len(text2))
+    if not longest:
+        return 1.0
+    max_distance = int((1 - cutoff) * longest + 1e-9)
+    if abs(len(text1) - len(text2)) > max_distance:
+        return 0.0
+    if len(text1) > len(text2):  # The shorter text is held in the bits.
+        text1, text2 = text2, text1
+    if longest <= BIT_PARALLEL_MAX_LENGTH:
+        distance = bit_parallel_distance(text1, text2, max_distance)
+    else:
+        distance = numpy_distance(text1, text2, max_distance)
+    if distance > max_distance:
+        return 0.0
+    return 1 - distance / longest
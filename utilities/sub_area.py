@@ -0,0 +1,145 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+from pathlib import Path
+
+import cv2 as cv
+import numpy as np
+
+import utilities.utils as utils
+
+logger = logging.getLogger(__name__)
+
+# File of the sub areas of series, shared by every program run.
+SUB_AREAS_FILE = utils.Config.cache_dir / "sub_areas.json"
+
+# Pixels in text boxes in fewer than this fraction of the sampled frames are stray detections.
+MIN_PERSISTENCE = 0.1
+# Pixels in text boxes in less than this fraction of the frames the most persistent pixel is in are left out.
+PEAK_FRACTION = 0.2
+# Standard deviation of the grayscale level across the sampled frames needed for a pixel to count as changing.
+# Subtitles change from frame to frame, logos and watermarks don't.
+MIN_CHANGE = 12.0
+# Rows of text separated by a gap of at most this fraction of the image height belong to the same subtitle.
+MAX_GAP_FRACTION = 0.05
+# Number of frames detected to check that the sub area of a series fits a video.
+VERIFY_SAMPLES = 8
+# Number of the checked frames that must have text in the sub area.
+MIN_VERIFIED_SAMPLES = 2
+
+
+def text_heatmap(shape: tuple, frame_boxes: list) -> np.ndarray:
+    """
+    Fraction of the sampled frames each pixel is inside a text box in.
+    :param shape: Shape of the frames.
+    :param frame_boxes: The text boxes of each frame, each box is a list of four [x, y] points.
+    """
+    heatmap, mask = np.zeros(shape[:2], dtype=np.float32), np.zeros(shape[:2], dtype=np.uint8)
+    for boxes in frame_boxes:
+        if not boxes:
+            continue
+        mask[:] = 0
+        cv.fillPoly(mask, [np.round(np.array(box)).astype(np.int32) for box in boxes], 1)
+        heatmap += mask
+    return heatmap / max(1, len(frame_boxes))
+
+
+def change_map(images: list[np.ndarray]) -> np.ndarray:
+    """
+    Standard deviation of the grayscale level of each pixel across the sampled frames.
+    """
+    gray = [cv.cvtColor(image, cv.COLOR_BGR2GRAY) if image.ndim == 3 else image for image in images]
+    return np.std(np.stack(gray), axis=0, dtype=np.float32)
+
+
+def find_text_area(heatmap: np.ndarray, changes: np.ndarray) -> tuple | None:
+    """
+    Find the area where text is both persistent and changing across the sampled frames.
+    The rows of the area are the band of text rows with the most text, the columns span the text in the band.
+    :param heatmap: Text box heatmap, see text_heatmap.
+    :param changes: Change of each pixel, see change_map.
+    :return: The top left and bottom right (exclusive) corners of the area as (x1, y1, x2, y2) or None.
+    """
+    text = np.where(changes >= MIN_CHANGE, heatmap, 0)
+    if not text.size or text.max() < MIN_PERSISTENCE:
+        return None
+    text = np.where(text >= max(MIN_PERSISTENCE, text.max() * PEAK_FRACTION), text, 0)
+    text_rows = np.flatnonzero(text.any(axis=1))
+    max_gap = max(1, int(text.shape[0] * MAX_GAP_FRACTION))
+    bands = np.split(text_rows, np.flatnonzero(np.diff(text_rows) > max_gap) + 1)
+    row_heat = text.sum(axis=1)
+    band = max(bands, key=lambda rows: row_heat[rows].sum())
+    top, bottom = int(band[0]), int(band[-1]) + 1
+    text_columns = np.flatnonzero(text[top:bottom].any(axis=0))
+    return int(text_columns[0]), top, int(text_columns[-1]) + 1, bottom
+
+
+def fits_text_area(frame_boxes: list, area: tuple) -> bool:
+    """
+    Whether the text of the frames is in the area. Enough frames must have text inside the area
+    and no text may cross its edges. Text that is away from the area, like a logo, is ignored.
+    :param frame_boxes: The text boxes of each frame, each box is a list of four [x, y] points.
+    :param area: The area as (x1, y1, x2, y2).
+    """
+    x1, y1, x2, y2 = area
+    text_frames = 0
+    for boxes in frame_boxes:
+        has_text = False
+        for box in boxes:
+            (box_x1, box_y1), (box_x2, box_y2) = np.min(box, axis=0), np.max(box, axis=0)
+            if box_x1 >= x1 and box_y1 >= y1 and box_x2 <= x2 and box_y2 <= y2:
+                has_text = True
+            elif box_x1 < x2 and box_x2 > x1 and box_y1 < y2 and box_y2 > y1:
+                return False
+        text_frames += has_text
+    return text_frames >= MIN_VERIFIED_SAMPLES
+
+
+def series_key(video_path: str, use_search_area: bool) -> str:
+    """
+    Key of the sub area of the videos of a series. Videos of a series are in the same directory,
+    have names that only differ in their numbers and are encoded with the same resolution, frame rate and codec.
+    """
+    path, capture = Path(video_path), cv.VideoCapture(video_path)
+    encoding = tuple(capture.get(prop) for prop in (cv.CAP_PROP_FRAME_WIDTH, cv.CAP_PROP_FRAME_HEIGHT,
+                                                    cv.CAP_PROP_FPS, cv.CAP_PROP_FOURCC))
+    capture.release()
+    settings = (str(path.parent.resolve()), re.sub(r"\d+", "#", path.stem), path.suffix.lower(), encoding,
+                use_search_area, utils.Config.sub_area_x_rel_padding, utils.Config.sub_area_y_abs_padding)
+    return hashlib.blake2b(repr(settings).encode(), digest_size=16).hexdigest()
+
+
+class SubAreaCache:
+    def __init__(self) -> None:
+        """
+        The sub areas detected for each series, kept in a JSON file so later videos of a series can reuse them.
+        """
+        self.file = SUB_AREAS_FILE
+        self.sub_areas = {}
+        if self.file.exists():
+            try:
+                self.sub_areas = json.loads(self.file.read_text(encoding="utf-8"))
+            except (OSError, ValueError) as error:
+                logger.warning(f"Sub areas of series could not be loaded, they will be detected again! {error}")
+
+    def get(self, key: str) -> tuple | None:
+        """
+        Return the sub area of a series, see series_key.
+        """
+        sub_area = self.sub_areas.get(key)
+        return tuple(sub_area) if sub_area else None
+
+    def put(self, key: str, sub_area: tuple) -> None:
+        """
+        Set the sub area of a series. The file is replaced in one step, so it's never left half written.
+        Each write has a partial file of its own, so program runs writing at the same time don't mix their files.
+        """
+        self.sub_areas[key] = list(sub_area)
+        self.file.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile('w', encoding="utf-8", dir=self.file.parent, prefix=f"{self.file.stem}.",
+                                         suffix=".part", delete=False) as partial_file:
+            partial_file.write(json.dumps(self.sub_areas))
+        os.replace(partial_file.name, self.file)
@@ -0,0 +1,53 @@
+from unittest import TestCase
+
+import numpy as np
+
+from utilities.frame_filters import BisectSampler, BlankFilter, ChangeGate, frame_change, frame_signature, is_blank
+
+
+class TestFrameFilters(TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        print("\nRunning setUpClass method...")
+        cls.blank = np.zeros((80, 800, 3), dtype=np.uint8)
+        cls.text = cls.blank.copy()
+        cls.text[32:52, 200:600] = 255
+
+    def test_frame_change(self):
+        print("\nRunning tests for frame_change function...")
+        blank_sig, text_sig = frame_signature(self.blank), frame_signature(self.text)
+        self.assertEqual(frame_change(blank_sig, blank_sig), 0.0)
+        self.assertEqual(frame_change(blank_sig, text_sig), 0.125)
+
+    def test_change_gate(self):
+        print("\nRunning tests for ChangeGate class...")
+        gate = ChangeGate(0.003)
+        self.assertEqual(gate.add(1.0, self.blank), [])
+        self.assertEqual(gate.add(2.0, self.blank), [])
+        self.assertEqual(gate.add(3.0, self.text)[0][::2], (1.0, [2.0]))
+        self.assertEqual(gate.add(4.0, self.text), [])
+        self.assertEqual(gate.flush()[0][::2], (3.0, [4.0]))
+        self.assertEqual(gate.flush(), [])
+
+    def test_bisect_sampler(self):
+        print("\nRunning tests for BisectSampler class...")
+        sampler = BisectSampler(0.003, 8)
+        frames = ((float(frame_no), self.text if 5 <= frame_no < 13 else self.blank) for frame_no in range(20))
+        groups = list(sampler.groups(frames))
+        self.assertEqual([group[::2] for group in groups],
+                         [(0.0, [1.0, 2.0, 3.0, 4.0]), (5.0, [float(i) for i in range(6, 13)]),
+                          (13.0, [float(i) for i in range(14, 20)])])
+        self.assertEqual(sampler.signatures, 10)
+        self.assertEqual(list(sampler.groups(iter([]))), [])
+
+    def test_blank_filter(self):
+        print("\nRunning tests for BlankFilter class...")
+        striped = self.blank.copy()
+        striped[32:52, 200:600:8] = 255
+        self.assertTrue(is_blank(self.blank))
+        self.assertFalse(is_blank(striped))
+        blank_filter = BlankFilter(2)
+        self.assertEqual(blank_filter.select([self.blank, striped, self.blank]), ([1, 2], [2]))
+        blank_filter.audit(["text"])
+        self.assertEqual(blank_filter.take_stats(), (1, 1, 1))
+        self.assertEqual(blank_filter.take_stats(), (0, 0, 0))
@@ -14,17 +14,9 @@ class TestSubtitleDetector(TestCase):
         print("Running setUpClass method...")
         cls.sd = SubtitleDetector(ch_vid, True)
 
-    def test_dir(self):
-        print("\nRunning test for vd_output_dir existence...")
-        self.assertTrue(self.sd.vd_output_dir.exists())
-
     def test__get_key_frames(self):
         print("\nRunning test for _get_key_frames method...")
-        self.sd._empty_cache()
-        self.sd.frame_output.mkdir(parents=True)
-        self.sd._get_key_frames()
-        no_of_frames = len(list(self.sd.frame_output.iterdir()))
-        self.assertEqual(no_of_frames, 20)
+        self.assertEqual(len(self.sd._get_key_frames()), 20)
 
     def test__pad_sub_area(self):
         print("\nRunning test for _pad_sub_area method...")
@@ -34,25 +26,26 @@ class TestSubtitleDetector(TestCase):
         print("\nRunning test for _reposition_sub_area method...")
         self.assertEqual(self.sd._reposition_sub_area((288, 148), (1632, 234)), ((288, 958), (1632, 1044)))
 
-    def test__empty_cache(self):
-        print("\nRunning test for _empty_cache method...")
-        self.sd._empty_cache()
-        self.sd.frame_output.mkdir(parents=True)
-        self.assertTrue(self.sd.vd_output_dir.exists())
-        self.sd._empty_cache()
-        self.assertFalse(self.sd.vd_output_dir.exists())
+    def assert_inside_area(self, sub_area: tuple, outer_area: tuple) -> None:
+        """
+        The heatmap keeps only the text rows that are in enough samples, so the area found is inside the padded
+        union of every text box, the area the min/max of the boxes gave. The subtitles are narrower than the
+        relative x padding, so the x coordinates are the padding.
+        """
+        self.assertIsNotNone(sub_area)
+        x1, y1, x2, y2 = sub_area
+        self.assertEqual((x1, x2), (outer_area[0], outer_area[2]))
+        self.assertTrue(outer_area[1] <= y1 < y2 <= outer_area[3], f"{sub_area} is not inside {outer_area}")
 
     def test_get_sub_area_search_area(self):
         print("\nRunning test for get_sub_area method with search area...")
-        sub_area = (288, 954, 1632, 1051)
         result = SubtitleDetector(ch_vid, True).get_sub_area()
-        self.assertEqual(sub_area, result)
+        self.assert_inside_area(result, (288, 954, 1632, 1051))
 
     def test_get_sub_area_full_area(self):
         print("\nRunning test for get_sub_area method without search area...")
-        sub_area = (288, 958, 1632, 1049)
         result = SubtitleDetector(ch_vid, False).get_sub_area()
-        self.assertEqual(sub_area, result)
+        self.assert_inside_area(result, (288, 958, 1632, 1049))
 
 
 class TestSubtitleExtractor(TestCase):
@@ -88,28 +81,12 @@ class TestSubtitleExtractor(TestCase):
 
     def test_similarity(self):
         print("\nRunning tests for similarity method...")
-        self.assertEqual(self.se.similarity("这漫天的星辰之中", "竟然还蕴含着星辰之力"), 0.3333333333333333)
-        self.assertEqual(self.se.similarity("竟然还蕴含着星辰之力", "竟竞然还蕴含着星辰之力"), 0.9523809523809523)
+        self.assertAlmostEqual(self.se.similarity("这漫天的星辰之中", "竟然还蕴含着星辰之力"), 0.3)
+        self.assertAlmostEqual(self.se.similarity("竟然还蕴含着星辰之力", "竟竞然还蕴含着星辰之力"), 0.9090909090909091)
         self.assertEqual(self.se.similarity("此机会多吸取一点", "大胆人类"), 0.0)
         self.assertEqual(self.se.similarity("颗果实就想打发我们", "颗果实就想打发我们"), 1.0)
-
-    def test_similar_text_name_gen(self):
-        print("\nRunning tests for similar_text_name_gen method...")
-        start_name, end_name = "3466.666666666667--4733.333333333333", "3466.666666666667--4733.333333333333"
-        self.assertEqual(self.se.similar_text_name_gen(start_name, end_name), "3466.666666666667--4733.333333333333")
-        start_name, end_name = "5066.666666666666--6200.0", "6333.333333333333--6666.666666666667"
-        self.assertEqual(self.se.similar_text_name_gen(start_name, end_name), "5066.666666666666--6666.666666666667")
-        start_name, end_name = "9866.666666666668--10466.666666666666", "11200.0--11733.333333333332"
-        self.assertEqual(self.se.similar_text_name_gen(start_name, end_name), "9866.666666666668--11733.333333333332")
-        start_name, end_name = "59733.333333333336--59800.0", "60933.33333333333--60933.33333333333"
-        self.assertEqual(self.se.similar_text_name_gen(start_name, end_name), "59733.333333333336--60933.33333333333")
-
-    def test_name_to_duration(self):
-        print("\nRunning tests for name_to_duration method...")
-        self.assertEqual(self.se.name_to_duration("5066.666666666666--6666.666666666667"), 1600.000000000001)
-        self.assertEqual(self.se.name_to_duration("17800.0--18200.0"), 400.0)
-        self.assertEqual(self.se.name_to_duration("20133.333333333332--21133.333333333332"), 1000.0)
-        self.assertEqual(self.se.name_to_duration("43533.33333333333--44200.0"), 666.6666666666715)
+        self.assertEqual(self.se.similarity("这漫天的星辰之中", "竟然还蕴含着星辰之力", 0.85), 0.0)
+        self.assertEqual(self.se.similarity("星辰之力", "力之辰星"), 0.0)  # Reordered text is not similar.
 
     def test_timecode(self):
         print("\nRunning tests for timecode method...")
@@ -126,4 +103,8 @@ class TestSubtitleExtractor(TestCase):
         test_sub_path = self.se.run_extraction(ch_vid, sub_area)
         test_sub_txt = test_sub_path.read_text(encoding="utf-8")
         test_sub_path.unlink()
-        self.assertEqual(test_sub_txt, ch_vid_srt.read_text(encoding="utf-8"))
+        expected_sub_txt = ch_vid_srt.read_text(encoding="utf-8")
+        if test_sub_txt != expected_sub_txt:
+            # Kept next to the fixture, so the new output can be reviewed and copied over it when it's correct.
+            ch_vid_srt.with_suffix(".new.srt").write_text(test_sub_txt, encoding="utf-8")
+        self.assertEqual(test_sub_txt, expected_sub_txt)
@@ -0,0 +1,63 @@
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+
+import cv2 as cv
+import numpy as np
+
+from utilities.ocr_cache import OCRCache, crop_hash
+
+
+class TestOCRCache(TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        print("\nRunning setUpClass method...")
+        cls.blank = np.zeros((80, 800, 3), dtype=np.uint8)
+        cls.text = cls.blank.copy()
+        cls.text[32:52, 200:600:4] = 255
+
+    def test_crop_hash(self):
+        print("\nRunning tests for crop_hash function...")
+        blank = np.zeros((128, 1536), dtype=np.uint8)
+        text = blank.copy()
+        text[32:64, 400:1200] = 255
+        noise = blank.copy()
+        noise[::7, ::5] = 10  # Compression noise in the background that doesn't change the subtitle.
+        self.assertEqual(crop_hash(text), crop_hash(np.where(text == 0, noise, text)))
+        # Low contrast crops only share a key with identical crops.
+        self.assertEqual(crop_hash(blank), crop_hash(blank.copy()))
+        self.assertNotEqual(crop_hash(blank), crop_hash(noise))
+        self.assertNotEqual(crop_hash(blank), crop_hash(np.full_like(blank, 40)))
+        self.assertNotEqual(crop_hash(text), crop_hash(blank))
+
+    def test_crop_hash_one_character(self):
+        print("\nRunning tests for crop_hash function with texts differing by one character...")
+        for text1, text2 in (("I love you", "I lose you"), ("Thank you very much", "Thank you very, much")):
+            crops = []
+            for text in (text1, text2):
+                crop = np.zeros((160, 1920, 3), dtype=np.uint8)
+                cv.putText(crop, text, (560, 110), cv.FONT_HERSHEY_SIMPLEX, 2.5, (255, 255, 255), 5)
+                crops.append(crop)
+            self.assertNotEqual(crop_hash(crops[0]), crop_hash(crops[1]))
+
+    def test_memory_tier(self):
+        print("\nRunning tests for the memory tier of OCRCache class...")
+        ocr_cache = OCRCache(1, "model/lang")
+        ocr_cache.put(["a", "b"], [("text a", 0.9, []), ("text b", 0.9, [])])
+        self.assertIsNone(ocr_cache.get("a"))  # Evicted by b.
+        self.assertEqual(ocr_cache.get("b"), ("text b", 0.9, []))
+        self.assertEqual(ocr_cache.take_stats(), (1, 1))
+        self.assertEqual(ocr_cache.take_stats(), (0, 0))
+
+    def test_disk_tier(self):
+        print("\nRunning tests for the disk tier of OCRCache class...")
+        with tempfile.TemporaryDirectory() as temp_dir:
+            disk_file = Path(temp_dir) / "ocr_cache.sqlite3"
+            ocr_cache = OCRCache(0, "model/lang", disk_file)
+            key = ocr_cache.key(self.text)
+            ocr_cache.put([key], [("text", 0.95, [[[1, 2], [3, 2], [3, 4], [1, 4]]])])
+            ocr_cache.connection.close()
+            ocr_cache = OCRCache(0, "model/lang", disk_file)
+            self.assertEqual(ocr_cache.get(key), ("text", 0.95, [[[1, 2], [3, 2], [3, 4], [1, 4]]]))
+            self.assertIsNone(ocr_cache.get(OCRCache(0, "model/other").key(self.text)))
+            ocr_cache.connection.close()
@@ -0,0 +1,47 @@
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+
+from utilities.results_store import ResultsStore, video_hash
+
+
+class TestResultsStore(TestCase):
+    def test_video_hash(self):
+        print("\nRunning tests for video_hash function...")
+        with tempfile.TemporaryDirectory() as temp_dir:
+            video_1, video_2 = Path(temp_dir) / "video_1.mp4", Path(temp_dir) / "video_2.mp4"
+            video_1.write_bytes(b"frames" * 1000)
+            video_2.write_bytes(b"frames" * 1000)
+            self.assertEqual(video_hash(str(video_1)), video_hash(str(video_2)))
+            video_2.write_bytes(b"frames" * 999 + b"frame!")
+            self.assertNotEqual(video_hash(str(video_1)), video_hash(str(video_2)))
+
+    def test_save_and_load(self):
+        print("\nRunning tests for ResultsStore save and load methods...")
+        with tempfile.TemporaryDirectory() as temp_dir:
+            store = ResultsStore("key")
+            store.file = Path(temp_dir) / "key.jsonl"
+            self.assertFalse(store.load())
+            store.add(2002.0, ("", 0.0, []))
+            store.add(1001.0, ("Hello", 0.98, [[[1, 2], [3, 2], [3, 4], [1, 4]]]))
+            self.assertFalse(store.file.exists())  # Only the partial file exists until the run completes.
+            other_store = ResultsStore("key")
+            other_store.file = store.file
+            other_store.add(1001.0, ("Hi", 0.9, []))
+            self.assertNotEqual(store.partial_file, other_store.partial_file)  # Runs at the same time don't mix.
+            other_store.discard()
+            store.save()
+            self.assertFalse(store.partial_file.exists())
+
+            loaded_store = ResultsStore("key")
+            loaded_store.file = store.file
+            self.assertTrue(loaded_store.load())
+            self.assertEqual(loaded_store.records, {2002.0: ("", 0.0, []),
+                                                    1001.0: ("Hello", 0.98, [[[1, 2], [3, 2], [3, 4], [1, 4]]])})
+            self.assertEqual(loaded_store.texts(), ([1001.0], ["Hello"]))
+
+            store.add(3003.0, ("Bye", 0.9, []))
+            store.discard()
+            self.assertFalse(store.partial_file.exists())
+            self.assertTrue(loaded_store.load())  # The discarded run didn't replace the stored results.
+            self.assertEqual(len(loaded_store.records), 2)
@@ -0,0 +1,53 @@
+import random
+from unittest import TestCase
+
+from utilities.segments import (Segments, SegmentStream, merge_adjacent_equal_texts, merge_adjacent_similar_texts,
+                                remove_short_duration_consecutive_subs, remove_short_duration_subs)
+from utilities.similarity import similarity
+
+
+class TestSegments(TestCase):
+    def test_merge_adjacent_equal_texts(self):
+        print("\nRunning tests for merge_adjacent_equal_texts function...")
+        frames = Segments.from_frames([0.0, 100.0, 200.0, 300.0, 400.0, 500.0], ["a", "a", "b", "b", "b", "b"])
+        self.assertEqual(list(merge_adjacent_equal_texts(frames)),
+                         [(0.0, 100.0, "a"), (200.0, 400.0, "b"), (500.0, 500.0, "b")])
+        self.assertEqual(list(merge_adjacent_equal_texts(Segments.from_frames([0.0], ["a"]))), [])
+
+    def test_merge_adjacent_similar_texts(self):
+        print("\nRunning tests for merge_adjacent_similar_texts function...")
+        segments = Segments([0.0, 600.0, 1000.0, 2000.0], [500.0, 900.0, 1800.0, 2500.0], ["ab", "ac", "xy", "zz"])
+        similarity = lambda text1, text2, cutoff: float(text1[0] == text2[0])
+        self.assertEqual(list(merge_adjacent_similar_texts(segments, 0.5, similarity)),
+                         [(0.0, 900.0, "ab"), (1000.0, 2500.0, "xy")])
+
+    def test_remove_short_duration_consecutive_subs(self):
+        print("\nRunning tests for remove_short_duration_consecutive_subs function...")
+        starts = [0.0, 1000.0, 1100.0, 1200.0, 1300.0, 2000.0, 2100.0, 3000.0]
+        ends = [900.0, 1050.0, 1150.0, 1250.0, 1350.0, 2050.0, 2900.0, 3050.0]
+        segments = Segments(starts, ends, list("abcdefgh"))
+        self.assertEqual(remove_short_duration_consecutive_subs(segments, 500.0, 3).texts, list("agh"))
+        self.assertEqual(remove_short_duration_consecutive_subs(segments, 500.0, 6).texts, list("abcdefgh"))
+
+    def test_remove_short_duration_subs(self):
+        print("\nRunning tests for remove_short_duration_subs function...")
+        segments = Segments([0.0, 1000.0, 2000.0], [100.0, 1120.0, 2500.0], list("abc"))
+        self.assertEqual(remove_short_duration_subs(segments, 120.0).texts, ["c"])
+
+    def test_segment_stream(self):
+        print("\nRunning tests for SegmentStream class...")
+        random.seed(0)
+        texts = ["hello world", "hello worle", "goodbye", "something else", "abc"]
+        for _ in range(200):
+            positions = [float(position) for position in sorted(random.sample(range(0, 20_000, 33), 40))]
+            frame_texts = [random.choice(texts) for _ in positions]
+            segments = Segments.from_frames(positions, frame_texts)
+            segments = merge_adjacent_equal_texts(segments)
+            segments = merge_adjacent_similar_texts(segments, 0.85, similarity)
+            segments = remove_short_duration_consecutive_subs(segments, 500.0, 4)
+            segments = remove_short_duration_subs(segments, 120.0)
+
+            stream = SegmentStream(0.85, similarity, 500.0, 4, 120.0)
+            streamed = [segment for position, text in zip(positions, frame_texts)
+                        for segment in stream.add(position, text)]
+            self.assertEqual(streamed + stream.finish(), list(segments))
@@ -0,0 +1,44 @@
+from unittest import TestCase
+
+import numpy as np
+
+from utilities.sub_area import change_map, find_text_area, fits_text_area, text_heatmap
+
+
+def box(x1: int, y1: int, x2: int, y2: int) -> list:
+    return [[x1, y1], [x2 - 1, y1], [x2 - 1, y2 - 1], [x1, y2 - 1]]
+
+
+class TestSubArea(TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        print("\nRunning setUpClass method...")
+        rng = np.random.default_rng(0)
+        cls.images = [rng.integers(0, 256, (200, 800, 3), dtype=np.uint8) for _ in range(20)]
+        for image in cls.images:
+            image[10:30, 700:780] = 255  # A logo that is in every frame.
+        # Subtitles in most frames, the logo in every frame and a stray box in one frame.
+        cls.frame_boxes = [[box(700, 10, 780, 30)] + ([box(200, 150, 600, 180)] if i % 4 else []) for i in range(20)]
+        cls.frame_boxes[3].append(box(0, 60, 100, 80))
+
+    def test_text_heatmap(self):
+        print("\nRunning tests for text_heatmap function...")
+        heatmap = text_heatmap(self.images[0].shape, self.frame_boxes)
+        self.assertEqual(heatmap.shape, (200, 800))
+        self.assertAlmostEqual(float(heatmap[165, 400]), 0.75)
+        self.assertAlmostEqual(float(heatmap[20, 740]), 1.0)
+        self.assertAlmostEqual(float(heatmap[70, 50]), 0.05)
+
+    def test_find_text_area(self):
+        print("\nRunning tests for find_text_area function...")
+        heatmap = text_heatmap(self.images[0].shape, self.frame_boxes)
+        changes = change_map(self.images)
+        self.assertEqual(find_text_area(heatmap, changes), (200, 150, 600, 180))
+        self.assertIsNone(find_text_area(np.zeros_like(heatmap), changes))
+
+    def test_fits_text_area(self):
+        print("\nRunning tests for fits_text_area function...")
+        area = (180, 140, 620, 190)
+        self.assertTrue(fits_text_area(self.frame_boxes, area))
+        self.assertFalse(fits_text_area(self.frame_boxes[:2], area))
+        self.assertFalse(fits_text_area(self.frame_boxes, (300, 140, 620, 190)))
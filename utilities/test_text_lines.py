@@ -0,0 +1,34 @@
+from unittest import TestCase
+
+import numpy as np
+
+from utilities.text_lines import find_line_rows, find_text_lines
+
+
+class TestTextLines(TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        print("\nRunning setUpClass method...")
+        cls.blank = np.zeros((80, 800, 3), dtype=np.uint8)
+
+    def test_find_line_rows(self):
+        print("\nRunning tests for find_line_rows function...")
+        profile = np.zeros(80)
+        profile[10:20] = profile[22:30] = profile[50:60] = 0.2
+        self.assertEqual(find_line_rows(profile), [(10, 30), (50, 60)])
+        self.assertEqual(find_line_rows(np.zeros(80)), [])
+
+    def test_find_text_lines(self):
+        print("\nRunning tests for find_text_lines function...")
+        self.assertEqual(find_text_lines(self.blank), [])
+
+        text = self.blank.copy()
+        text[32:52, 200:600:4] = 255  # Vertical strokes of a single line of text.
+        lines = find_text_lines(text)
+        self.assertEqual(len(lines), 1)
+        self.assertEqual(lines[0][0], [[199, 32], [598, 32], [598, 52], [199, 52]])
+        self.assertEqual(lines[0][1].shape, (28, 407, 3))
+
+        cut_off = self.blank.copy()
+        cut_off[0:20, 200:600:4] = 255
+        self.assertIsNone(find_text_lines(cut_off))
@@ -0,0 +1,15 @@
+from unittest import TestCase
+
+from utilities.video_to_frames import plan_frame_chunks
+
+
+class TestVideoToFrames(TestCase):
+    def test_plan_frame_chunks(self):
+        print("\nRunning tests for plan_frame_chunks function...")
+        key_frames = list(range(0, 1000, 50))
+        self.assertEqual(plan_frame_chunks(key_frames, 0, 1000, 1),
+                         [[0, 250], [250, 500], [500, 750], [750, 1000]])
+        # Chunks are never smaller than the GOP length.
+        self.assertEqual(plan_frame_chunks(key_frames, 0, 1000, 16), [[i, i + 50] for i in range(0, 1000, 50)])
+        # The first chunk starts at the start frame even when it's not a key frame.
+        self.assertEqual(plan_frame_chunks(key_frames, 120, 400, 1), [[120, 200], [200, 300], [300, 400]])
@@ -0,0 +1,62 @@
+import cv2 as cv
+import numpy as np
+
+# Difference in grayscale level between neighbouring pixels needed for a pixel to count as a text edge.
+EDGE_LEVEL = 40
+# Fraction of the pixels in a row that must be edges for the row to be part of a text line.
+ROW_EDGE_DENSITY = 0.01
+# Text rows separated by a gap of at most this many pixels belong to the same line.
+MAX_ROW_GAP = 2
+# Lines lower than this height in pixels can't be told apart from noise.
+MIN_LINE_HEIGHT = 8
+# Subtitles rarely have more lines than this, more lines means there is text or texture in the background.
+MAX_LINES = 3
+# Pixels of background kept around each line crop.
+LINE_PADDING = 4
+
+
+def edge_map(image: np.ndarray) -> np.ndarray:
+    """
+    Mark the pixels where the grayscale level changes sharply from the pixel on their left.
+    """
+    gray = cv.cvtColor(image, cv.COLOR_BGR2GRAY) if image.ndim == 3 else image
+    return np.abs(np.diff(gray.astype(np.int16), axis=1)) > EDGE_LEVEL
+
+
+def find_line_rows(row_profile: np.ndarray) -> list:
+    """
+    Group the rows of a horizontal projection profile into lines.
+    :param row_profile: Fraction of edge pixels in each row.
+    :return: The top and bottom (exclusive) row of each line.
+    """
+    text_rows = np.flatnonzero(row_profile > ROW_EDGE_DENSITY)
+    if not text_rows.size:
+        return []
+    breaks = np.flatnonzero(np.diff(text_rows) > MAX_ROW_GAP + 1)
+    tops = np.r_[text_rows[0], text_rows[breaks + 1]]
+    bottoms = np.r_[text_rows[breaks], text_rows[-1]] + 1
+    return list(zip(tops.tolist(), bottoms.tolist()))
+
+
+def find_text_lines(image: np.ndarray) -> list | None:
+    """
+    Find the lines of text in a subtitle area with the horizontal and vertical projection profiles of its edges.
+    :param image: The subtitle area of a frame.
+    :return: The box and crop of each line from top to bottom, an empty list when there is no text or
+    None when the projection is ambiguous and the lines have to be found with text detection.
+    """
+    edges = edge_map(image)
+    height = edges.shape[0]
+    line_rows = find_line_rows(edges.mean(axis=1))
+    if len(line_rows) > MAX_LINES:
+        return None
+    lines = []
+    for top, bottom in line_rows:
+        if bottom - top < MIN_LINE_HEIGHT or top == 0 or bottom == height:  # Noise or a line cut off by the area.
+            return None
+        columns = np.flatnonzero(edges[top:bottom].any(axis=0))
+        left, right = int(columns[0]), int(columns[-1]) + 2  # The edge map is one pixel narrower than the image.
+        box = [[left, top], [right, top], [right, bottom], [left, bottom]]
+        lines.append((box, image[max(0, top - LINE_PADDING):bottom + LINE_PADDING,
+                                 max(0, left - LINE_PADDING):right + LINE_PADDING]))
+    return lines
@@ -1,15 +1,18 @@
 import logging
+import tempfile
+import threading
 from configparser import ConfigParser
 from os import cpu_count
 from pathlib import Path
 
-import paddle
-
 logger = logging.getLogger(__name__)
 
 
 class Process:
     interrupt_process = False
+    # Extraction jobs of a program run one at a time. They share the ocr worker pool, its queues
+    # and the interrupt flag, so a second job waits for this lock until the first one is done.
+    job_lock = threading.Lock()
 
     @classmethod
     def start_process(cls) -> None:
@@ -31,6 +34,8 @@ class Process:
 class Config:
     # Config file location will always be the same regardless of which module starts the program.
     config_file = Path(__file__).parent.parent / "config.ini"
+    # Directory of the caches kept between program runs. It's ignored by git, like the config file.
+    cache_dir = Path(__file__).parent.parent / "cache"
     config = ConfigParser()
     config.read(config_file)
 
@@ -39,45 +44,71 @@ class Config:
             "ocr_gpu_max_processes", "ocr_rec_language", "text_similarity_threshold", "min_consecutive_sub_dur_ms",
             "max_consecutive_short_durs", "min_sub_duration_ms", "split_start", "split_stop", "no_of_frames",
             "sub_area_x_rel_padding", "sub_area_y_abs_padding", "use_search_area", "win_notify_sound",
-            "win_notify_loop_sound", "ocr_cpu_max_processes"]
+            "win_notify_loop_sound", "ocr_cpu_max_processes", "save_frames_to_disk",
+            "frame_queue_size", "frame_change_threshold", "use_bisect_sampling", "coarse_sampling_stride",
+            "det_batch_size", "use_line_finder", "ocr_cache_size", "use_ocr_disk_cache", "stream_subtitles",
+            "use_blank_filter", "blank_audit_interval", "use_temporal_det", "rec_batch_size", "use_sub_area_cache",
+            "work_dir_root"]
 
     # Permanent values
     subarea_height_scaler = 0.75
+    ocr_model_version = "PP-OCRv4"  # Version of the paddle ocr models, part of the keys of stored ocr results.
 
     # Default values
-    use_gpu = paddle.device.is_compiled_with_cuda()
-    device_msg = "GPU in use." if use_gpu else "CPU in use."
-
     default_frame_extraction_frequency = 2
     default_frame_extraction_chunk_size = 250
+    default_save_frames_to_disk = False
+    default_frame_queue_size = 32
+    default_frame_change_threshold = 0.003
+    default_use_bisect_sampling = False
+    default_coarse_sampling_stride = 24
+    default_work_dir_root = ""  # Empty uses the temp directory of the system.
 
     default_text_extraction_chunk_size = 150
     default_ocr_gpu_max_processes = 4
-    default_ocr_cpu_max_processes = cpu_count() // 2
+    default_ocr_cpu_max_processes = max(1, cpu_count() // 2)
     default_ocr_rec_language = "ch"
+    default_det_batch_size = 8
+    default_use_line_finder = False
+    default_ocr_cache_size = 2048
+    default_use_ocr_disk_cache = False
+    default_use_blank_filter = True
+    default_blank_audit_interval = 100
+    default_use_temporal_det = False
+    default_rec_batch_size = 16
 
     default_text_similarity_threshold = 0.85
     default_min_consecutive_sub_dur_ms = 500.0
     default_max_consecutive_short_durs = 4
     default_min_sub_duration_ms = 120.0
+    default_stream_subtitles = True
 
-    default_split_start = 0.25
-    default_split_stop = 0.5
+    default_split_start = 0.0
+    default_split_stop = 1.0
     default_no_of_frames = 200
     default_sub_area_x_rel_padding = 0.85
     default_sub_area_y_abs_padding = 20
     default_use_search_area = True
+    default_use_sub_area_cache = True
 
     default_win_notify_sound = "Default"
     default_win_notify_loop_sound = True
 
     # Initial values
-    frame_extraction_frequency = frame_extraction_chunk_size = None
+    frame_extraction_frequency = frame_extraction_chunk_size = save_frames_to_disk = frame_queue_size = None
+    frame_change_threshold = use_bisect_sampling = coarse_sampling_stride = work_dir_root = None
     text_extraction_chunk_size = ocr_gpu_max_processes = ocr_cpu_max_processes = ocr_rec_language = None
+    det_batch_size = use_line_finder = ocr_cache_size = use_ocr_disk_cache = None
+    use_blank_filter = blank_audit_interval = use_temporal_det = rec_batch_size = None
     text_similarity_threshold = min_consecutive_sub_dur_ms = max_consecutive_short_durs = min_sub_duration_ms = None
+    stream_subtitles = None
     split_start = split_stop = no_of_frames = sub_area_x_rel_padding = sub_area_y_abs_padding = use_search_area = None
+    use_sub_area_cache = None
     win_notify_sound = win_notify_loop_sound = None
 
+    # Lazy values
+    _use_gpu = None
+
     def __init__(self) -> None:
         if not self.config_file.exists():
             self.create_default_config_file()
@@ -88,26 +119,56 @@ class Config:
         Creates a new config file with the default values.
         """
         self.config[self.sections[0]] = {self.keys[0]: str(self.default_frame_extraction_frequency),
-                                         self.keys[1]: self.default_frame_extraction_chunk_size}
+                                         self.keys[1]: self.default_frame_extraction_chunk_size,
+                                         self.keys[18]: self.default_save_frames_to_disk,
+                                         self.keys[19]: self.default_frame_queue_size,
+                                         self.keys[20]: self.default_frame_change_threshold,
+                                         self.keys[21]: self.default_use_bisect_sampling,
+                                         self.keys[22]: self.default_coarse_sampling_stride,
+                                         self.keys[33]: self.default_work_dir_root}
         self.config[self.sections[1]] = {self.keys[2]: self.default_text_extraction_chunk_size,
                                          self.keys[3]: self.default_ocr_gpu_max_processes,
                                          self.keys[17]: self.default_ocr_cpu_max_processes,
-                                         self.keys[4]: self.default_ocr_rec_language}
+                                         self.keys[4]: self.default_ocr_rec_language,
+                                         self.keys[23]: self.default_det_batch_size,
+                                         self.keys[24]: self.default_use_line_finder,
+                                         self.keys[25]: self.default_ocr_cache_size,
+                                         self.keys[26]: self.default_use_ocr_disk_cache,
+                                         self.keys[28]: self.default_use_blank_filter,
+                                         self.keys[29]: self.default_blank_audit_interval,
+                                         self.keys[30]: self.default_use_temporal_det,
+                                         self.keys[31]: self.default_rec_batch_size}
         self.config[self.sections[2]] = {self.keys[5]: str(self.default_text_similarity_threshold),
                                          self.keys[6]: self.default_min_consecutive_sub_dur_ms,
                                          self.keys[7]: self.default_max_consecutive_short_durs,
-                                         self.keys[8]: self.default_min_sub_duration_ms}
+                                         self.keys[8]: self.default_min_sub_duration_ms,
+                                         self.keys[27]: self.default_stream_subtitles}
         self.config[self.sections[3]] = {self.keys[9]: str(self.default_split_start),
                                          self.keys[10]: self.default_split_stop,
                                          self.keys[11]: self.default_no_of_frames,
                                          self.keys[12]: self.default_sub_area_x_rel_padding,
                                          self.keys[13]: self.default_sub_area_y_abs_padding,
-                                         self.keys[14]: self.default_use_search_area}
+                                         self.keys[14]: self.default_use_search_area,
+                                         self.keys[32]: self.default_use_sub_area_cache}
         self.config[self.sections[4]] = {self.keys[15]: self.default_win_notify_sound,
                                          self.keys[16]: self.default_win_notify_loop_sound}
         with open(self.config_file, 'w') as configfile:
             self.config.write(configfile)
 
+    @classmethod
+    def use_gpu(cls) -> bool:
+        """
+        Whether paddle was compiled with cuda. Paddle takes seconds to import, so it's only imported when needed.
+        """
+        if cls._use_gpu is None:
+            import paddle
+            cls._use_gpu = paddle.device.is_compiled_with_cuda()
+        return cls._use_gpu
+
+    @classmethod
+    def device_msg(cls) -> str:
+        return "GPU in use." if cls.use_gpu() else "CPU in use."
+
     @classmethod
     def load_config(cls) -> None:
         """
@@ -115,16 +176,42 @@ class Config:
         """
         cls.frame_extraction_frequency = cls.config[cls.sections[0]].getint(cls.keys[0])
         cls.frame_extraction_chunk_size = cls.config[cls.sections[0]].getint(cls.keys[1])
+        # Keys added after the first release fall back to their defaults for older config files.
+        cls.save_frames_to_disk = cls.config[cls.sections[0]].getboolean(cls.keys[18],
+                                                                         fallback=cls.default_save_frames_to_disk)
+        cls.frame_queue_size = cls.config[cls.sections[0]].getint(cls.keys[19], fallback=cls.default_frame_queue_size)
+        cls.frame_change_threshold = cls.config[cls.sections[0]].getfloat(cls.keys[20],
+                                                                          fallback=cls.default_frame_change_threshold)
+        cls.use_bisect_sampling = cls.config[cls.sections[0]].getboolean(cls.keys[21],
+                                                                         fallback=cls.default_use_bisect_sampling)
+        cls.coarse_sampling_stride = cls.config[cls.sections[0]].getint(cls.keys[22],
+                                                                        fallback=cls.default_coarse_sampling_stride)
+        cls.work_dir_root = cls.config[cls.sections[0]].get(cls.keys[33], fallback=cls.default_work_dir_root)
 
         cls.text_extraction_chunk_size = cls.config[cls.sections[1]].getint(cls.keys[2])
         cls.ocr_gpu_max_processes = cls.config[cls.sections[1]].getint(cls.keys[3])
         cls.ocr_cpu_max_processes = cls.config[cls.sections[1]].getint(cls.keys[17])
         cls.ocr_rec_language = cls.config[cls.sections[1]][cls.keys[4]]
+        cls.det_batch_size = cls.config[cls.sections[1]].getint(cls.keys[23], fallback=cls.default_det_batch_size)
+        cls.use_line_finder = cls.config[cls.sections[1]].getboolean(cls.keys[24],
+                                                                     fallback=cls.default_use_line_finder)
+        cls.ocr_cache_size = cls.config[cls.sections[1]].getint(cls.keys[25], fallback=cls.default_ocr_cache_size)
+        cls.use_ocr_disk_cache = cls.config[cls.sections[1]].getboolean(cls.keys[26],
+                                                                        fallback=cls.default_use_ocr_disk_cache)
+        cls.use_blank_filter = cls.config[cls.sections[1]].getboolean(cls.keys[28],
+                                                                      fallback=cls.default_use_blank_filter)
+        cls.blank_audit_interval = cls.config[cls.sections[1]].getint(cls.keys[29],
+                                                                      fallback=cls.default_blank_audit_interval)
+        cls.use_temporal_det = cls.config[cls.sections[1]].getboolean(cls.keys[30],
+                                                                      fallback=cls.default_use_temporal_det)
+        cls.rec_batch_size = cls.config[cls.sections[1]].getint(cls.keys[31], fallback=cls.default_rec_batch_size)
 
         cls.text_similarity_threshold = cls.config[cls.sections[2]].getfloat(cls.keys[5])
         cls.min_consecutive_sub_dur_ms = cls.config[cls.sections[2]].getfloat(cls.keys[6])
         cls.max_consecutive_short_durs = cls.config[cls.sections[2]].getint(cls.keys[7])
         cls.min_sub_duration_ms = cls.config[cls.sections[2]].getfloat(cls.keys[8])
+        cls.stream_subtitles = cls.config[cls.sections[2]].getboolean(cls.keys[27],
+                                                                      fallback=cls.default_stream_subtitles)
 
         cls.split_start = cls.config[cls.sections[3]].getfloat(cls.keys[9])
         cls.split_stop = cls.config[cls.sections[3]].getfloat(cls.keys[10])
@@ -132,6 +219,8 @@ class Config:
         cls.sub_area_x_rel_padding = cls.config[cls.sections[3]].getfloat(cls.keys[12])
         cls.sub_area_y_abs_padding = cls.config[cls.sections[3]].getint(cls.keys[13])
         cls.use_search_area = cls.config[cls.sections[3]].getboolean(cls.keys[14])
+        cls.use_sub_area_cache = cls.config[cls.sections[3]].getboolean(cls.keys[32],
+                                                                        fallback=cls.default_use_sub_area_cache)
 
         cls.win_notify_sound = cls.config[cls.sections[4]][cls.keys[15]]
         cls.win_notify_loop_sound = cls.config[cls.sections[4]].getboolean(cls.keys[16])
@@ -148,6 +237,18 @@ class Config:
         cls.config[cls.sections[0]][cls.keys[0]] = str(cls.frame_extraction_frequency)
         cls.frame_extraction_chunk_size = kwargs.get(cls.keys[1], cls.frame_extraction_chunk_size)
         cls.config[cls.sections[0]][cls.keys[1]] = str(cls.frame_extraction_chunk_size)
+        cls.save_frames_to_disk = kwargs.get(cls.keys[18], cls.save_frames_to_disk)
+        cls.config[cls.sections[0]][cls.keys[18]] = str(cls.save_frames_to_disk)
+        cls.frame_queue_size = kwargs.get(cls.keys[19], cls.frame_queue_size)
+        cls.config[cls.sections[0]][cls.keys[19]] = str(cls.frame_queue_size)
+        cls.frame_change_threshold = kwargs.get(cls.keys[20], cls.frame_change_threshold)
+        cls.config[cls.sections[0]][cls.keys[20]] = str(cls.frame_change_threshold)
+        cls.use_bisect_sampling = kwargs.get(cls.keys[21], cls.use_bisect_sampling)
+        cls.config[cls.sections[0]][cls.keys[21]] = str(cls.use_bisect_sampling)
+        cls.coarse_sampling_stride = kwargs.get(cls.keys[22], cls.coarse_sampling_stride)
+        cls.config[cls.sections[0]][cls.keys[22]] = str(cls.coarse_sampling_stride)
+        cls.work_dir_root = kwargs.get(cls.keys[33], cls.work_dir_root)
+        cls.config[cls.sections[0]][cls.keys[33]] = str(cls.work_dir_root)
 
         cls.text_extraction_chunk_size = kwargs.get(cls.keys[2], cls.text_extraction_chunk_size)
         cls.config[cls.sections[1]][cls.keys[2]] = str(cls.text_extraction_chunk_size)
@@ -157,6 +258,22 @@ class Config:
         cls.config[cls.sections[1]][cls.keys[17]] = str(cls.ocr_cpu_max_processes)
         cls.ocr_rec_language = kwargs.get(cls.keys[4], cls.ocr_rec_language)
         cls.config[cls.sections[1]][cls.keys[4]] = cls.ocr_rec_language
+        cls.det_batch_size = kwargs.get(cls.keys[23], cls.det_batch_size)
+        cls.config[cls.sections[1]][cls.keys[23]] = str(cls.det_batch_size)
+        cls.use_line_finder = kwargs.get(cls.keys[24], cls.use_line_finder)
+        cls.config[cls.sections[1]][cls.keys[24]] = str(cls.use_line_finder)
+        cls.ocr_cache_size = kwargs.get(cls.keys[25], cls.ocr_cache_size)
+        cls.config[cls.sections[1]][cls.keys[25]] = str(cls.ocr_cache_size)
+        cls.use_ocr_disk_cache = kwargs.get(cls.keys[26], cls.use_ocr_disk_cache)
+        cls.config[cls.sections[1]][cls.keys[26]] = str(cls.use_ocr_disk_cache)
+        cls.use_blank_filter = kwargs.get(cls.keys[28], cls.use_blank_filter)
+        cls.config[cls.sections[1]][cls.keys[28]] = str(cls.use_blank_filter)
+        cls.blank_audit_interval = kwargs.get(cls.keys[29], cls.blank_audit_interval)
+        cls.config[cls.sections[1]][cls.keys[29]] = str(cls.blank_audit_interval)
+        cls.use_temporal_det = kwargs.get(cls.keys[30], cls.use_temporal_det)
+        cls.config[cls.sections[1]][cls.keys[30]] = str(cls.use_temporal_det)
+        cls.rec_batch_size = kwargs.get(cls.keys[31], cls.rec_batch_size)
+        cls.config[cls.sections[1]][cls.keys[31]] = str(cls.rec_batch_size)
 
         cls.text_similarity_threshold = kwargs.get(cls.keys[5], cls.text_similarity_threshold)
         cls.config[cls.sections[2]][cls.keys[5]] = str(cls.text_similarity_threshold)
@@ -166,6 +283,8 @@ class Config:
         cls.config[cls.sections[2]][cls.keys[7]] = str(cls.max_consecutive_short_durs)
         cls.min_sub_duration_ms = kwargs.get(cls.keys[8], cls.min_sub_duration_ms)
         cls.config[cls.sections[2]][cls.keys[8]] = str(cls.min_sub_duration_ms)
+        cls.stream_subtitles = kwargs.get(cls.keys[27], cls.stream_subtitles)
+        cls.config[cls.sections[2]][cls.keys[27]] = str(cls.stream_subtitles)
 
         cls.split_start = kwargs.get(cls.keys[9], cls.split_start)
         cls.config[cls.sections[3]][cls.keys[9]] = str(cls.split_start)
@@ -179,6 +298,8 @@ class Config:
         cls.config[cls.sections[3]][cls.keys[13]] = str(cls.sub_area_y_abs_padding)
         cls.use_search_area = kwargs.get(cls.keys[14], cls.use_search_area)
         cls.config[cls.sections[3]][cls.keys[14]] = str(cls.use_search_area)
+        cls.use_sub_area_cache = kwargs.get(cls.keys[32], cls.use_sub_area_cache)
+        cls.config[cls.sections[3]][cls.keys[32]] = str(cls.use_sub_area_cache)
 
         cls.win_notify_sound = kwargs.get(cls.keys[15], cls.win_notify_sound)
         cls.config[cls.sections[4]][cls.keys[15]] = cls.win_notify_sound
@@ -190,6 +311,18 @@ class Config:
         logger.debug("Configuration values changed!")
 
 
+def job_work_dir() -> tempfile.TemporaryDirectory:
+    """
+    Create a scratch directory of its own for a job, under the work directory root or the temp directory
+    of the system. Jobs of separate program runs using the same root never share files. The directory is deleted
+    by its cleanup method, or when the program exits if the job didn't clean it up.
+    """
+    root = Path(Config.work_dir_root) if Config.work_dir_root else None
+    if root:
+        root.mkdir(parents=True, exist_ok=True)
+    return tempfile.TemporaryDirectory(prefix="job_", dir=root)
+
+
 def print_progress(iteration: int, total: int, prefix: str = '', suffix: str = 'Complete', decimals: int = 3,
                    bar_length: int = 25) -> None:
     """
@@ -1,23 +1,34 @@
 import logging
+import traceback
 from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import pairwise
+from math import ceil
+from multiprocessing import Queue
+from os import cpu_count
 from pathlib import Path
+from typing import Iterator
 
 import cv2 as cv
+import numpy as np
 
 import utilities.utils as utils
+from utilities.frame_filters import BisectSampler, ChangeGate
 
 logger = logging.getLogger(__name__)
 
+CHUNKS_PER_WORKER = 4  # Number of chunks planned for each worker, so workers that finish early can take more.
 
-def extract_frames(video_path: str, frames_dir: Path, key_area: tuple | None, start: int, end: int, every: int) -> None:
+
+def read_frames(video_path: str, key_area: tuple | None, start: int, end: int,
+                every: int) -> Iterator[tuple[float, np.ndarray]]:
     """
-    Extract frames from a video using OpenCVs VideoCapture.
+    Read frames from a video using OpenCVs VideoCapture and yield them without saving them to disk.
     :param video_path: Path of the video.
-    :param frames_dir: The directory to save the frames.
     :param key_area: Coordinates of the frame containing subtitle.
     :param start: Start frame.
     :param end: End frame.
     :param every: Frame spacing.
+    :return: The position of the frame in milliseconds and the (cropped) frame.
     """
     capture = cv.VideoCapture(video_path)  # open the video using OpenCV
 
@@ -30,29 +41,188 @@ def extract_frames(video_path: str, frames_dir: Path, key_area: tuple | None, st
     frame = start  # keep track of which frame we are up to, starting from start
     while_safety = 0  # a safety counter to ensure we don't enter an infinite while loop (hopefully we won't need it)
 
-    while frame < end:  # let's loop through the frames until the end
-        _, image = capture.read()  # read an image from the capture
+    try:
+        while frame < end:  # let's loop through the frames until the end
+            if while_safety > 500:  # break the while if our safety max's out at 500
+                break
+
+            # grab advances the capture without converting the frame into an image, this is enough for skipped frames
+            if not capture.grab():  # if we get a bad return flag, lets not count the frame
+                while_safety += 1  # add 1 to our while safety, since we skip before incrementing our frame variable
+                continue  # skip
+
+            if frame % every == 0:  # if this is a frame we want to keep based on the 'every' argument
+                _, image = capture.retrieve()  # only retrieve the image of frames that are kept
+                # sometimes OpenCV reads Nones during a video, in which case we want to just skip
+                if image is None:
+                    while_safety += 1
+                    continue
+                while_safety = 0  # reset the safety count
+                # crop key area
+                if key_area:
+                    x1, y1, x2, y2 = key_area
+                    image = image[y1:y2, x1:x2]
+                yield capture.get(cv.CAP_PROP_POS_MSEC), image
 
-        if while_safety > 500:  # break the while if our safety max's out at 500
-            break
+            frame += 1  # increment our frame count
+    finally:
+        capture.release()  # after the while has finished close the capture
 
-        # sometimes OpenCV reads Nones during a video, in which case we want to just skip
-        if image is None:  # if we get a bad return flag or the image we read is None, lets not save
-            while_safety += 1  # add 1 to our while safety, since we skip before incrementing our frame variable
-            continue  # skip
 
-        if frame % every == 0:  # if this is a frame we want to write out based on the 'every' argument
-            while_safety = 0  # reset the safety count
-            # crop and save key area
+def read_frame_samples(video_path: str, key_area: tuple | None, frame_nos: list) -> list[np.ndarray]:
+    """
+    Read the frames at the given frame numbers by seeking to each one, for samples spread across a video.
+    :param video_path: Path of the video.
+    :param key_area: Coordinates of the frame containing subtitle.
+    :param frame_nos: Frame numbers of the samples.
+    :return: The (cropped) frames that could be read.
+    """
+    capture, images = cv.VideoCapture(video_path), []
+    try:
+        for frame_no in frame_nos:
+            capture.set(cv.CAP_PROP_POS_FRAMES, frame_no)
+            _, image = capture.read()
+            if image is None:
+                continue
             if key_area:
                 x1, y1, x2, y2 = key_area
                 image = image[y1:y2, x1:x2]
-            frame_position = capture.get(cv.CAP_PROP_POS_MSEC)
-            save_name = f"{frames_dir}/{frame_position}.jpg"  # create the save path
-            cv.imwrite(save_name, image)  # save the extracted image
+            images.append(image)
+    finally:
+        capture.release()
+    return images
+
+
+def extract_frames(video_path: str, frames_dir: Path, key_area: tuple | None, start: int, end: int, every: int) -> None:
+    """
+    Extract frames from a video and save them to disk.
+    :param video_path: Path of the video.
+    :param frames_dir: The directory to save the frames.
+    :param key_area: Coordinates of the frame containing subtitle.
+    :param start: Start frame.
+    :param end: End frame.
+    :param every: Frame spacing.
+    """
+    for frame_position, image in read_frames(video_path, key_area, start, end, every):
+        save_name = f"{frames_dir}/{frame_position}.jpg"  # create the save path
+        cv.imwrite(save_name, image)  # save the extracted image
+
+
+def frame_groups(video_path: str, key_area: tuple | None, start: int, end: int, every: int) -> Iterator[tuple]:
+    """
+    Group the unchanged frames of a chunk so only the first frame of each group has to be sent to ocr.
+    :return: The groups as (frame position, frame, duplicate frame positions).
+    """
+    threshold = utils.Config.frame_change_threshold
+    if not utils.Config.use_bisect_sampling:
+        gate = ChangeGate(threshold)
+        for frame_position, image in read_frames(video_path, key_area, start, end, every):
+            yield from gate.add(frame_position, image)
+        yield from gate.flush()
+        return
+    sampler, no_of_frames = BisectSampler(threshold, utils.Config.coarse_sampling_stride), 0
+    for group in sampler.groups(read_frames(video_path, key_area, start, end, every)):
+        no_of_frames += 1 + len(group[2])
+        yield group
+    logger.debug(f"Bisect sampling compared {sampler.signatures} of {no_of_frames} frames from chunk {start}-{end}")
+
+
+def decode_frames(video_path: str, key_area: tuple | None, every: int, chunk_queue: Queue, frame_queue: Queue,
+                  event_queue: Queue) -> None:
+    """
+    Producer stage of the text extraction pipeline.
+    Decode the frame chunks given in the chunk queue and put the frames into the bounded frame queue.
+    The put blocks when the queue is full, so decoding can not run ahead of text extraction.
+    Frames that are unchanged from the last frame put in the queue are not put in the queue themselves,
+    their positions are sent along with that frame so they can be given the same text.
+    :param video_path: Path of the video.
+    :param key_area: Coordinates of the frame containing subtitle.
+    :param every: Frame spacing.
+    :param chunk_queue: Queue with [index, start, end] frame chunks. None signals that there are no more chunks.
+    :param frame_queue: Queue the chunk index, frame position, frame and positions of unchanged frames are put in.
+    :param event_queue: Queue used to report the number of frame positions sent from each chunk or errors.
+    """
+    try:
+        while (chunk := chunk_queue.get()) is not None:
+            chunk_index, start, end = chunk
+            no_of_frames = 0
+            for group in frame_groups(video_path, key_area, start, end, every):
+                frame_queue.put((chunk_index, *group))
+                no_of_frames += 1 + len(group[2])
+            event_queue.put(("decoded", (chunk_index, no_of_frames)))
+    except Exception:
+        event_queue.put(("error", traceback.format_exc()))
+
+
+def get_key_frames(video_path: str) -> list:
+    """
+    Read the frame numbers of the key frames in a video.
+    The video is opened in raw mode so the packets are only demuxed and never decoded.
+    :return: Key frame numbers. Empty list if the OpenCV build can not report key frames.
+    """
+    if not hasattr(cv, "CAP_PROP_LRF_HAS_KEY_FRAME"):
+        return []
+    capture = cv.VideoCapture(video_path, cv.CAP_FFMPEG, [cv.CAP_PROP_FORMAT, -1])
+    key_frames, frame = [], 0
+    while capture.grab():
+        if capture.get(cv.CAP_PROP_LRF_HAS_KEY_FRAME):
+            key_frames.append(frame)
+        frame += 1
+    capture.release()
+    return key_frames
+
+
+def plan_frame_chunks(key_frames: list, start_frame: int, stop_frame: int, workers: int) -> list:
+    """
+    Split the frames into chunks that start on key frames, so a seek to the start of a chunk lands on a key frame
+    and no frames are decoded only to be thrown away.
+    The chunk size is based on the number of workers with a few chunks per worker for load balancing,
+    and it is never smaller than the average distance between key frames (GOP length).
+    :return: List of [start, end] frame pairs.
+    """
+    gop_length = (key_frames[-1] - key_frames[0]) / (len(key_frames) - 1) if len(key_frames) > 1 else 1
+    target_size = max(ceil((stop_frame - start_frame) / (workers * CHUNKS_PER_WORKER)), ceil(gop_length))
+    boundaries = [start_frame]
+    for key_frame in key_frames:
+        if start_frame < key_frame < stop_frame and key_frame - boundaries[-1] >= target_size:
+            boundaries.append(key_frame)
+    boundaries.append(stop_frame)
+    logger.debug(f"Key frame chunk plan: key frames = {len(key_frames)}, GOP length = {gop_length:.1f}, "
+                 f"target chunk size = {target_size}, chunks = {len(boundaries) - 1}")
+    return [[start, end] for start, end in pairwise(boundaries)]
+
+
+def get_frame_chunks(video_path: str, start_frame: int = None, stop_frame: int = None,
+                     workers: int = None) -> list:
+    """
+    Split the frames of a video into chunks that can be given to separate processes.
+    The chunks are aligned to the key frames when they can be read, otherwise the frame extraction chunk size is used.
+    :param video_path: path like string to the video
+    :param start_frame: The frame where image extractions from video starts.
+    :param stop_frame: The frame where image extractions from video stops.
+    :param workers: Number of processes the chunks will be shared between.
+    :return: List of [start, end] frame pairs. Empty list if the video has no frames.
+    """
+    # how many frames to split into chunks (one chunk per cpu core process)
+    chunk_size = utils.Config.frame_extraction_chunk_size
+    capture = cv.VideoCapture(video_path)  # load the video
+    frame_count = int(capture.get(cv.CAP_PROP_FRAME_COUNT))  # get its total frame count
+    capture.release()  # release the capture straight away
 
-        frame += 1  # increment our frame count
-    capture.release()  # after the while has finished close the capture
+    if frame_count < 1:  # if video has no frames, might be and opencv error
+        logger.error("Video has no frames. Check your OpenCV installation")
+        return []
+
+    start_frame, stop_frame = start_frame or 0, stop_frame or frame_count
+    if key_frames := get_key_frames(video_path):
+        return plan_frame_chunks(key_frames, start_frame, stop_frame, workers or cpu_count())
+
+    # ignore chunk size if it's greater than frame count
+    chunk_size = chunk_size if frame_count > chunk_size else frame_count - 1
+    # split the frames into chunk lists
+    frame_chunks = [[i, i + chunk_size] for i in range(start_frame, stop_frame, chunk_size)]
+    frame_chunks[-1][-1] = stop_frame  # make sure last chunk has correct end frame
+    return frame_chunks
 
 
 def video_to_frames(video_path: str, frames_dir: Path, key_area: tuple | None, start_frame: int = None,
@@ -67,8 +237,6 @@ def video_to_frames(video_path: str, frames_dir: Path, key_area: tuple | None, s
     """
     # extract every this many frames.
     every = utils.Config.frame_extraction_frequency
-    # how many frames to split into chunks (one chunk per cpu core process)
-    chunk_size = utils.Config.frame_extraction_chunk_size
     # cancel if process has been cancelled by gui.
     prefix = "Frame Extraction"
     if utils.Process.interrupt_process:
@@ -76,21 +244,9 @@ def video_to_frames(video_path: str, frames_dir: Path, key_area: tuple | None, s
         return
 
     logger.info(f"Starting {prefix} from video...")
-    capture = cv.VideoCapture(video_path)  # load the video
-    frame_count = int(capture.get(cv.CAP_PROP_FRAME_COUNT))  # get its total frame count
-    capture.release()  # release the capture straight away
-
-    # ignore chunk size if it's greater than frame count
-    chunk_size = chunk_size if frame_count > chunk_size else frame_count - 1
-
-    if frame_count < 1:  # if video has no frames, might be and opencv error
-        logger.error("Video has no frames. Check your OpenCV installation")
+    frame_chunks = get_frame_chunks(video_path, start_frame, stop_frame)
+    if not frame_chunks:
         return  # end function call
-
-    start_frame, stop_frame = start_frame or 0, stop_frame or frame_count
-    # split the frames into chunk lists
-    frame_chunks = [[i, i + chunk_size] for i in range(start_frame, stop_frame, chunk_size)]
-    frame_chunks[-1][-1] = stop_frame  # make sure last chunk has correct end frame
     no_chunks = len(frame_chunks)
     logger.debug(f"Using multiprocessing for {prefix}")
     # create a process pool to execute across multiple cpu cores to speed up processing